@@ -0,0 +1,115 @@
+"""
+Progress tracking and stop conditions for a running conversion.
+
+These live in their own importable module because Streamlit re-executes the
+app script on every rerun, defining its classes afresh each time. The cached
+converter and background conversion jobs outlive the run that created them,
+so the exceptions they raise must come from classes that stay the same
+across reruns for the page script to tell them apart.
+"""
+import threading
+
+
+class MemoryLimitExceeded(MemoryError):
+    """
+    Raised when a conversion grows past the configured memory ceiling
+    """
+
+
+class ConversionCancelled(Exception):
+    """
+    Raised inside a conversion once the user has cancelled it
+    """
+
+
+class ConversionProgress:
+    """
+    Live progress of one conversion. The thread running the conversion
+    updates it and the page script polls it; cancel() makes the conversion
+    stop with ConversionCancelled at its next page.
+    """
+
+    def __init__(self):
+        self.stage = "Starting"
+        self.pages_done = 0
+        self.total_pages = None
+        self.transactions = 0
+        self.finished = False
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def finish(self):
+        self.stage = "Done"
+        self.finished = True
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        """
+        Raise ConversionCancelled if cancel() was called
+        """
+        if self._cancelled.is_set():
+            raise ConversionCancelled("Conversion cancelled")
+
+    def fraction(self):
+        """
+        Share of pages done, between 0 and 1 (0 while the total is unknown)
+        """
+        if self.finished:
+            return 1.0
+        if not self.total_pages:
+            return 0.0
+        return min(self.pages_done / self.total_pages, 1.0)
+
+
+class BatchProgress:
+    """
+    Combined progress of several uploads converted side by side, one
+    ConversionProgress per file, polled by the page as a single conversion
+    """
+
+    def __init__(self, file_count):
+        self.files = [ConversionProgress() for _ in range(file_count)]
+        # Set once every file is converted and they are being combined
+        self.merge_stage = None
+
+    def cancel(self):
+        for progress in self.files:
+            progress.cancel()
+
+    @property
+    def cancelled(self):
+        return any(progress.cancelled for progress in self.files)
+
+    @property
+    def stage(self):
+        if self.merge_stage:
+            return self.merge_stage
+        if len(self.files) == 1:
+            return self.files[0].stage
+        done = sum(progress.finished for progress in self.files)
+        return f"Converting statements ({done} / {len(self.files)} done)"
+
+    @property
+    def pages_done(self):
+        return sum(progress.pages_done for progress in self.files)
+
+    @property
+    def total_pages(self):
+        """
+        Page total across files, or None until every file has counted its pages
+        """
+        if any(progress.total_pages is None for progress in self.files):
+            return None
+        return sum(progress.total_pages for progress in self.files)
+
+    @property
+    def transactions(self):
+        return sum(progress.transactions for progress in self.files)
+
+    def fraction(self):
+        return sum(progress.fraction() for progress in self.files) / len(self.files)
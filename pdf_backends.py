@@ -0,0 +1,138 @@
+"""
+Text extraction backends used behind UniversalBankConverter.extract_pdf_text.
+
+Every backend exposes the same interface:
+    count_pages(pdf_source)                    -> number of pages
+    iter_pages(pdf_source, page_indices=None, reopen_every=None)
+                                               -> one text string per page
+
+pdf_source may be a path, bytes / memoryview, or a file-like object.
+page_indices are 0-based; None means every page, out-of-range ones are ignored.
+reopen_every closes and reopens the document every N pages so the parser's
+per-document object caches cannot grow with the page count.
+"""
+import gc
+import io
+import os
+
+import pdfplumber
+from PyPDF2 import PdfReader
+
+
+def open_pdf(pdf_source, **kwargs):
+    """
+    Open a PDF with pdfplumber from a path, raw bytes / memoryview, or a
+    file-like object (including an mmap) without writing it to disk
+    """
+    return pdfplumber.open(_as_stream(pdf_source), **kwargs)
+
+
+def _as_stream(pdf_source):
+    """
+    Wrap in-memory PDF bytes in a stream and rewind file-like sources
+    """
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(pdf_source)
+    if not isinstance(pdf_source, (str, os.PathLike)) and hasattr(pdf_source, 'seek'):
+        pdf_source.seek(0)
+    return pdf_source
+
+
+def _page_batches(page_indices, page_count, reopen_every):
+    """
+    Split the requested pages into batches of reopen_every pages
+    (a single batch of everything when reopen_every is not set)
+    """
+    if not reopen_every:
+        return [page_indices]
+    if page_indices is None:
+        page_indices = range(page_count)
+    page_indices = list(page_indices)
+    return [page_indices[i:i + reopen_every] for i in range(0, len(page_indices), reopen_every)]
+
+
+# Word attributes kept for geometry-based parsing (small and picklable)
+WORD_KEYS = ('text', 'x0', 'x1', 'top', 'bottom')
+
+
+class PdfplumberBackend:
+    """
+    Full layout analysis; slower but robust on complex statements
+    """
+    name = 'pdfplumber'
+
+    def count_pages(self, pdf_source):
+        with open_pdf(pdf_source) as pdf:
+            return len(pdf.pages)
+
+    def _iter_open_pages(self, pdf_source, page_indices=None, reopen_every=None):
+        """
+        Yield pdfplumber pages, closing each one (which releases its layout
+        objects) once the caller moves on to the next
+        """
+        page_count = self.count_pages(pdf_source) if reopen_every and page_indices is None else None
+        for batch in _page_batches(page_indices, page_count, reopen_every):
+            page_numbers = [index + 1 for index in batch] if batch is not None else None
+            with open_pdf(pdf_source, pages=page_numbers) as pdf:
+                for page in pdf.pages:
+                    yield page
+                    page.close()
+            if reopen_every:
+                gc.collect()
+
+    def iter_pages(self, pdf_source, page_indices=None, reopen_every=None):
+        for page in self._iter_open_pages(pdf_source, page_indices, reopen_every):
+            yield page.extract_text() or ""
+
+    def iter_page_words(self, pdf_source, page_indices=None, reopen_every=None):
+        """
+        Yield each page's words with their coordinates, for table parsing
+        """
+        for page in self._iter_open_pages(pdf_source, page_indices, reopen_every):
+            yield [
+                {key: word[key] for key in WORD_KEYS}
+                for word in page.extract_words()
+            ]
+
+
+class PyPDF2Backend:
+    """
+    Raw text-layer extraction; much faster on simple text-based statements
+    """
+    name = 'pypdf2'
+
+    def count_pages(self, pdf_source):
+        return len(PdfReader(_as_stream(pdf_source)).pages)
+
+    def iter_pages(self, pdf_source, page_indices=None, reopen_every=None):
+        reader = PdfReader(_as_stream(pdf_source))
+        page_count = len(reader.pages)
+        if page_indices is None:
+            page_indices = range(page_count)
+        for position, index in enumerate(page_indices):
+            if reopen_every and position and position % reopen_every == 0:
+                reader = PdfReader(_as_stream(pdf_source))
+                gc.collect()
+            if index < page_count:
+                yield reader.pages[index].extract_text() or ""
+
+
+EXTRACTION_BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend(),
+    PyPDF2Backend.name: PyPDF2Backend(),
+}
+
+# Backend tried first in auto mode
+FAST_BACKEND = PyPDF2Backend.name
+# Backend used when the fast result fails the quality check
+ROBUST_BACKEND = PdfplumberBackend.name
+
+
+def get_backend(name):
+    """
+    Look up an extraction backend by name
+    """
+    try:
+        return EXTRACTION_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown extraction backend: {name}")
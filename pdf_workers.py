@@ -0,0 +1,50 @@
+"""
+Process-pool workers for parallel PDF text extraction.
+
+These live in their own importable module because ProcessPoolExecutor pickles
+the callable by reference, and functions defined inside the Streamlit script
+cannot be looked up again from a worker process.
+"""
+from pdf_backends import get_backend
+
+# PDF bytes shared with every task of a worker process (set by init_worker)
+_worker_pdf_source = None
+
+
+def pdf_bytes(pdf_source):
+    """
+    Return the raw bytes of an in-memory PDF source so it can be shipped to
+    worker processes (memoryviews and mmaps cannot be pickled)
+    """
+    if isinstance(pdf_source, bytes):
+        return pdf_source
+    if isinstance(pdf_source, (bytearray, memoryview)):
+        return bytes(pdf_source)
+    if hasattr(pdf_source, 'getvalue'):
+        return pdf_source.getvalue()
+    pdf_source.seek(0)
+    return pdf_source.read()
+
+
+def init_worker(pdf_source):
+    """
+    Process-pool initializer: receive an in-memory PDF once per worker
+    instead of once per task
+    """
+    global _worker_pdf_source
+    _worker_pdf_source = pdf_source
+
+
+def extract_pages(pdf_source, page_indices, backend='pdfplumber', words=False):
+    """
+    Open the PDF independently and extract the text of the given 0-based pages.
+    Returns one string per page, in page order ('' for pages without text),
+    or with words=True one list of positioned words per page.
+    A pdf_source of None uses the PDF handed to init_worker.
+    """
+    if pdf_source is None:
+        pdf_source = _worker_pdf_source
+
+    if words:
+        return list(get_backend(backend).iter_page_words(pdf_source, page_indices))
+    return list(get_backend(backend).iter_pages(pdf_source, page_indices))
@@ -0,0 +1,19 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def app():
+    """
+    The Streamlit app module, imported in bare mode (no server)
+    """
+    spec = importlib.util.spec_from_file_location("bank_app", os.path.join(ROOT, "updated app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,22 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "updated app.py")
+
+
+def run_app(monkeypatch, cpu_count):
+    monkeypatch.setattr(os, "cpu_count", lambda: cpu_count)
+    return AppTest.from_file(APP_PATH, default_timeout=60).run()
+
+
+def test_page_loads_on_a_single_core_host(monkeypatch):
+    at = run_app(monkeypatch, 1)
+    assert not at.exception
+    assert not [slider for slider in at.slider if slider.label == "Parallel extraction workers"]
+
+
+def test_worker_slider_on_a_multi_core_host(monkeypatch):
+    at = run_app(monkeypatch, 4)
+    assert not at.exception
+    assert [slider.max for slider in at.slider if slider.label == "Parallel extraction workers"] == [4]
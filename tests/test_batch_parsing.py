@@ -0,0 +1,61 @@
+import pytest
+
+GENERIC_LINES = [
+    "Statement of account USD",
+    "01/02/2024 TRANSFER To 1,234.56 To 9,999.00",
+    "01/02/2024 WIRE From 500.00 From 1,500.00",
+    "03/02/2024 POS PURCHASE TOYOTA 120.00 880.00",
+    "04/02/2024 SALARY CREDIT FROM ACME 1,000.00 1,880.00",
+    "3/4/2024 ATM -200.00",
+    "05/05/2024 refund +12.00",
+    "Statement period 01/01/2024 to 31/01/2024",
+]
+
+# Dated lines no grammar matches, left to the per-line fallback parser
+FALLBACK_LINES = [
+    "12-05-2024 misc 10.00 ref 22.50 and 33.10",
+    "13-05-2024 PAID TO BOB ref 7.25 fee 0.50 total 7.75",
+]
+
+HDFC_LINES = [
+    "HDFC BANK LTD Statement of account",
+    "Opening Balance 10,000.00",
+    "01/04/24 UPI-SWIGGY-PAYMENT 0000123456 01/04/24 250.00 9,750.00",
+    "02/04/24 NEFT CR ACME PAYROLL 0000123457 02/04/24 5,000.00 14,750.00",
+    "15/04/2024 CASH DEPOSIT BRANCH 100.00 14,850.00",
+]
+
+
+@pytest.mark.parametrize("lines, bank", [
+    (GENERIC_LINES, None),
+    (FALLBACK_LINES, None),
+    (GENERIC_LINES + FALLBACK_LINES, None),
+    (HDFC_LINES, 'HDFC'),
+])
+def test_batch_and_line_parsing_agree(app, lines, bank):
+    converter = app.UniversalBankConverter()
+    bank_parser = app.BANK_PARSERS.get(bank)
+    classifier = app.get_direction_classifier(bank)
+
+    line_stats = {'rejected': 0, 'parsed': 0}
+    expected = list(converter.iter_transactions(lines, 'USD', line_stats, bank_parser, classifier=classifier))
+    frame_stats = {'rejected': 0, 'parsed': 0}
+    frame = converter.parse_lines_frame(lines, 'USD', frame_stats, bank_parser, classifier=classifier)
+
+    assert expected
+    assert frame.to_dict('records') == expected
+    assert frame_stats == line_stats
+
+
+@pytest.mark.parametrize("lines", [GENERIC_LINES + FALLBACK_LINES, HDFC_LINES])
+def test_batch_text_extraction_matches_line_extraction(app, lines):
+    converter = app.UniversalBankConverter()
+    text = "\n".join(lines)
+
+    line_stats = {'rejected': 0, 'parsed': 0}
+    expected, currency = converter.extract_transactions_from_pdf_text(text, line_stats)
+    frame_stats = {'rejected': 0, 'parsed': 0}
+    frame, frame_currency = converter.extract_transactions_frame_from_pdf_text(text, frame_stats)
+
+    assert frame.to_dict('records') == expected
+    assert (frame_currency, frame_stats) == (currency, line_stats)
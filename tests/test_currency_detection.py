@@ -0,0 +1,64 @@
+import pandas as pd
+
+HDFC_IMPS_STATEMENT = "\n".join([
+    "HDFC BANK LTD",
+    "Statement of account",
+    "Currency : INR",
+    "Date Narration Chq./Ref.No. Value Dt Withdrawal Amt. Deposit Amt. Closing Balance",
+] + [
+    f"0{day}/04/24 IMPS/P2A/4091{day}2233/RAHUL/HDFC 00000409{day} 0{day}/04/24 1,500.00 2{day},000.00"
+    for day in range(1, 8)
+])
+
+UPI_LINES = pd.Series([
+    "05/04/24 UPI/409512345678/PAYMENT FROM PHONE/SBIN/rahul@oksbi/IMPS/P2A 0000 05/04/24 250.00 9,750.00",
+    "06/04/24 NEFT/KKBK0000123/ROOPS/RENTS/APRIL 0000 06/04/24 100.00 9,650.00",
+])
+
+
+def test_imps_narrations_do_not_read_as_soles(app):
+    result = app.CURRENCY_DETECTOR.scan(HDFC_IMPS_STATEMENT)
+    assert result['currency'] == 'INR'
+    assert 'PEN' not in dict(result['ranking'])
+
+
+def test_statement_currency_from_header(app):
+    converter = app.UniversalBankConverter()
+    assert converter.detect_currency(HDFC_IMPS_STATEMENT) == 'INR'
+
+
+def test_row_tags_ignore_symbols_inside_words(app):
+    tags = app.CURRENCY_DETECTOR.tag_rows(UPI_LINES, 'INR')
+    assert tags.tolist() == ['INR', 'INR']
+
+
+def test_standalone_symbols_still_tag_rows(app):
+    lines = pd.Series(["01/04/2024 Lima hotel S/ 320.00", "02/04/2024 Toronto C$ 45.10", "03/04/2024 Cairo E£ 80.00"])
+    assert app.CURRENCY_DETECTOR.tag_rows(lines, 'USD').tolist() == ['PEN', 'CAD', 'EGP']
+
+
+def test_son_of_is_not_soles(app):
+    header = "Account holder: RAHUL KUMAR S/O RAMESH KUMAR\nAndheri East, Mumbai 400069"
+    assert app.CURRENCY_DETECTOR.scan(header)['currency'] != 'PEN'
+    lines = pd.Series(["05/04/2024 NEFT CR RAHUL KUMAR S/O RAMESH 5,000.00"])
+    assert app.CURRENCY_DETECTOR.tag_rows(lines, 'INR').tolist() == ['INR']
+
+
+def test_bank_names_only_match_whole_words(app):
+    converter = app.UniversalBankConverter()
+    assert converter.detect_bank("UBER TAXIS 120.00\nFABINDIA 75.00\nSUBSBIDY REFUND 10.00") is None
+    assert converter.detect_bank("NEFT from SBI account\nHDFC Bank statement\nHDFC BANK LTD") == 'HDFC'
+
+
+def test_streaming_reports_the_statement_currency_not_the_first_row(app):
+    converter = app.UniversalBankConverter()
+    page = "\n".join([
+        "HDFC BANK LTD Currency : INR",
+        "01/04/2024 CARD PAYMENT USD 10.00 1,000.00",
+        "02/04/2024 SALARY 100.00 1,100.00",
+    ])
+    transactions, currency = converter._collect_transactions(
+        converter.iter_transactions_from_pages([page]), app.ConversionProgress()
+    )
+    assert currency == 'INR'
+    assert transactions[0]['Currency'] == 'USD'
@@ -0,0 +1,23 @@
+LINES = [
+    "01/04/2024 POS PURCHASE TOYOTA 120.00 880.00",
+    "02/04/2024 SALARY CREDIT FROM ACME 1,000.00 1,880.00",
+    "03/04/2024 TOTAL REWARDS 5.00 1,885.00",
+]
+
+
+def test_classify_returns_the_deciding_keyword(app):
+    classifier = app.DEFAULT_CLASSIFIER
+    assert classifier.classify("SALARY CREDIT FROM ACME, TRANSFER FEE") == ("Outgoing", "TRANSFER")
+    assert classifier.classify("salary credit from acme") == ("Incoming", "CREDIT")
+    assert classifier.classify("TOTAL TOYOTA") == (None, None)
+
+
+def test_matched_keywords_are_recorded_for_audit(app):
+    converter = app.UniversalBankConverter()
+    line_stats = {'rejected': 0, 'parsed': 0}
+    list(converter.iter_transactions(LINES, 'USD', line_stats))
+    assert line_stats['direction_keywords'] == {'PURCHASE': 1, 'CREDIT': 1}
+
+    frame_stats = {'rejected': 0, 'parsed': 0}
+    converter.parse_lines_frame(LINES, 'USD', frame_stats)
+    assert frame_stats['direction_keywords'] == line_stats['direction_keywords']
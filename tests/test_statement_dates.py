@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+
+BANK_DATE_LINES = [
+    ('HDFC', "01/04/24 UPI-SWIGGY-PAYMENT 0000123456 01/04/24 100.00 10,000.00"),
+    ('SBI', "1 Apr 2023 1 Apr 2023 BY TRANSFER NEFT 100.00 10,000.00"),
+    ('HSBC', "01 Jan 24 CARD PAYMENT TESCO 10.00 1,000.00"),
+    (None, "15/04/2024 SALARY CREDIT 5,000.00 15,000.00"),
+]
+
+# Lines of a plain statement that only look dated to another bank's grammar
+NON_TRANSACTION_LINES = [
+    "Card ending 4111 valid thru 12/26 credit limit 5,000.00",
+    "minimum payment 25.00 due 15/05",
+]
+
+
+@pytest.mark.parametrize("bank, line", BANK_DATE_LINES)
+def test_prefilter_accepts_the_statement_banks_dates(app, bank, line):
+    converter = app.UniversalBankConverter()
+    dates = app.BANK_PARSERS[bank].line_dates if bank else app.GENERIC_DATES
+    assert converter.prefilter_line(line, dates).start() == 0
+    assert app.STATEMENT_DATES.search(line).start() == 0
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_other_banks_date_shapes_are_not_transactions(app, batch):
+    converter = app.UniversalBankConverter()
+    lines = ["Statement of account GBP"] + NON_TRANSACTION_LINES
+    if batch:
+        transactions = converter.parse_lines_frame(lines, 'GBP').to_dict('records')
+    else:
+        transactions = list(converter.iter_transactions(lines, 'GBP'))
+    assert transactions == []
+
+
+def test_dates_inside_longer_numbers_are_ignored(app):
+    assert app.STATEMENT_DATES.search("Ref 1234/56/78901 amount 10.00") is None
+    assert app.STATEMENT_DATES.search("Account 0123 Mar 20245") is None
+
+
+def test_every_bank_date_is_registered(app):
+    for parser in app.BANK_PARSERS.values():
+        assert parser.date_pattern in app.STATEMENT_DATES.patterns
+
+
+def test_us_bank_dates_are_month_first_and_take_the_statement_year(app):
+    converter = app.UniversalBankConverter()
+    parsed, _ = converter.parse_dates(pd.Series(['01/02/2024', '01/15', '02/29']), 'Citibank')
+    assert list(parsed.dt.strftime('%Y-%m-%d')) == ['2024-01-02', '2024-01-15', '2024-02-29']
+
+
+def test_each_grammar_keeps_its_own_date_format(app):
+    converter = app.UniversalBankConverter()
+    parsed, _ = converter.parse_dates(pd.Series(['01/04/24', '15/04/2024', '1 Apr 2023']))
+    assert list(parsed.dt.strftime('%Y-%m-%d')) == ['2024-04-01', '2024-04-15', '2023-04-01']
+
+
+def test_yearless_dates_take_the_statement_period_year(app):
+    converter = app.UniversalBankConverter()
+    text = "\n".join([
+        "Citibank N.A. Statement period 12/01/2025 - 12/31/2025",
+        "12/15 GROCERY STORE -45.10 1,000.00",
+        "12/20 PAYROLL DEPOSIT 2,000.00 3,000.00",
+    ])
+    line_stats = {'rejected': 0, 'parsed': 0}
+    transactions, _ = converter.extract_transactions_from_pdf_text(text, line_stats)
+    df, _ = converter.transactions_frame(transactions, line_stats['bank_parser'], line_stats['header_dates'])
+    assert list(df['Parsed Date'].dt.strftime('%Y-%m-%d')) == ['2025-12-15', '2025-12-20']
+
+
+def test_yearless_dates_across_the_new_year(app):
+    converter = app.UniversalBankConverter()
+    parsed, _ = converter.parse_dates(pd.Series(['12/28', '01/03']), 'Citibank', ['12/15/2025', '01/14/2026'])
+    assert list(parsed.dt.strftime('%Y-%m-%d')) == ['2025-12-28', '2026-01-03']
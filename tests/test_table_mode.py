@@ -0,0 +1,50 @@
+def page_words(lines):
+    """
+    Positioned words for a page: one row per line, each (x, text) cell
+    split into words
+    """
+    words = []
+    for row_index, cells in enumerate(lines):
+        top = 100 + row_index * 20
+        for x, text in cells:
+            for word in text.split():
+                words.append({'text': word, 'x0': x, 'x1': x + 6 * len(word), 'top': top, 'bottom': top + 10})
+                x += 6 * len(word) + 4
+    return words
+
+
+COVER_PAGE = page_words([
+    [(50, "Important information about your account")],
+    [(50, "Please read these terms and keep them for your records")],
+])
+
+STATEMENT_PAGE = page_words([
+    [(50, "Emirates NBD Account Statement Currency: AED Dubai")],
+    [(50, "Date"), (150, "Description"), (350, "Debit"), (420, "Credit"), (500, "Balance")],
+    [(50, "01/01/2024"), (150, "SALARY CREDIT"), (420, "5,000.00"), (500, "15,000.00")],
+    [(50, "02/01/2024"), (150, "POS PURCHASE"), (350, "200.00"), (500, "14,800.00")],
+])
+
+
+def convert_pages(app, converter, pages, template_store):
+    table_stats = {}
+    transactions, currency = converter._collect_transactions(
+        converter.iter_table_transactions_from_pages(iter(pages), template_store=template_store, table_stats=table_stats),
+        app.ConversionProgress()
+    )
+    return transactions, currency, table_stats
+
+
+def test_cover_page_does_not_decide_currency_or_bank(app):
+    converter = app.UniversalBankConverter()
+    template_store = app.LayoutTemplateStore(template_dir=None)
+    pages = [COVER_PAGE] + [STATEMENT_PAGE] * 5
+
+    transactions, currency, table_stats = convert_pages(app, converter, pages, template_store)
+    assert currency == 'AED'
+    assert table_stats['bank'] == 'Emirates NBD'
+    assert len(transactions) == 10
+
+    # The layout learned for the bank is reused by its next statement
+    _, _, table_stats = convert_pages(app, converter, pages, template_store)
+    assert table_stats['template_warm']
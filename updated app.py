@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 import tempfile
 import os
@@ -10,6 +11,19 @@ from plotly.subplots import make_subplots
 import re
 import pdfplumber
 import io
+import math
+import time
+import hashlib
+import threading
+import itertools
+import functools
+from collections import OrderedDict
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pdf_backends import FAST_BACKEND, ROBUST_BACKEND, get_backend
+from pdf_workers import extract_pages, init_worker, pdf_bytes
+from conversion_progress import BatchProgress, ConversionCancelled, ConversionProgress, MemoryLimitExceeded
 
 # Set page config
 st.set_page_config(
@@ -58,148 +72,1137 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class UniversalBankConverter:
+# Bump whenever parsing output changes so cached conversions are invalidated
+PARSER_VERSION = "15"
+
+# Conversion cache settings. Parsed transactions only go to disk
+# when BANK_CONVERTER_CACHE_DIR is set; otherwise the cache is memory-only
+CACHE_DIR = os.environ.get("BANK_CONVERTER_CACHE_DIR") or None
+CACHE_MEMORY_ENTRIES = 32
+CACHE_DISK_BYTES = 512 * 1024 * 1024
+# Learned table column layouts, persisted per bank alongside the cache
+TEMPLATE_DIR = os.path.join(CACHE_DIR, "layout_templates") if CACHE_DIR else None
+# Finished conversions (DataFrame, Excel bytes, charts) memoized by st.cache_data
+CONVERSION_RESULT_ENTRIES = 8
+# How often the page polls a running conversion for progress
+PROGRESS_POLL_SECONDS = 0.5
+# Transactions grid: rows sent to the browser per page
+TRANSACTION_PAGE_SIZES = [100, 500, 1000, 5000]
+TRANSACTION_DEFAULT_PAGE_SIZE = 500
+# Sort orders offered above the grid: label -> (column, ascending)
+TRANSACTION_SORT_ORDERS = {
+    "Date (oldest first)": ('Parsed Date', True),
+    "Date (newest first)": ('Parsed Date', False),
+    "Amount (largest outgoing first)": ('Amount', True),
+    "Amount (largest incoming first)": ('Amount', False),
+}
+
+# Low-memory mode: reopen the PDF every N pages, spill intermediate text to
+# disk past this size, and detect currency from this much leading text
+LOW_MEMORY_REOPEN_PAGES = 50
+LOW_MEMORY_SPILL_BYTES = 8 * 1024 * 1024
+LOW_MEMORY_CURRENCY_SAMPLE = 64 * 1024
+
+def make_private_dir(path):
     """
-    Universal Bank Statement Converter for Streamlit App
+    Create a directory (and its parents) only this user can read
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    os.chmod(path, 0o700)
+
+def open_private(path):
+    """
+    Open a file for writing, created readable by this user only
+    """
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8')
+
+def current_rss_bytes():
+    """
+    Resident memory of this process, or None where it can't be read
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class ConversionCache:
+    """
+    Content-addressed cache of parsed transactions (never the statement text).
+    Entries are keyed by the SHA-256 of the PDF bytes plus the parser version
+    and live in a bounded in-memory LRU tier, backed by a size-bounded disk
+    tier of owner-only files when a cache_dir is given.
     """
     
-    def __init__(self):
-        self.supported_currencies = {
-            'USD': {'symbol': '$', 'name': 'US Dollar'},
-            'EUR': {'symbol': '€', 'name': 'Euro'},
-            'GBP': {'symbol': '£', 'name': 'British Pound'},
-            'JPY': {'symbol': '¥', 'name': 'Japanese Yen'},
-            'CNY': {'symbol': '¥', 'name': 'Chinese Yuan'},
-            'INR': {'symbol': '₹', 'name': 'Indian Rupee'},
-            'AED': {'symbol': 'د.إ', 'name': 'UAE Dirham'},
-            'SAR': {'symbol': 'ر.س', 'name': 'Saudi Riyal'},
-            'CHF': {'symbol': 'Fr', 'name': 'Swiss Franc'},
-            'CAD': {'symbol': 'C$', 'name': 'Canadian Dollar'},
-            'AUD': {'symbol': 'A$', 'name': 'Australian Dollar'},
-            'SGD': {'symbol': 'S$', 'name': 'Singapore Dollar'},
-            'HKD': {'symbol': 'HK$', 'name': 'Hong Kong Dollar'},
-            'NZD': {'symbol': 'NZ$', 'name': 'New Zealand Dollar'},
-            'SEK': {'symbol': 'kr', 'name': 'Swedish Krona'},
-            'NOK': {'symbol': 'kr', 'name': 'Norwegian Krone'},
-            'DKK': {'symbol': 'kr', 'name': 'Danish Krone'},
-            'PLN': {'symbol': 'zł', 'name': 'Polish Zloty'},
-            'CZK': {'symbol': 'Kč', 'name': 'Czech Koruna'},
-            'HUF': {'symbol': 'Ft', 'name': 'Hungarian Forint'},
-            'RON': {'symbol': 'lei', 'name': 'Romanian Leu'},
-            'BGN': {'symbol': 'лв', 'name': 'Bulgarian Lev'},
-            'HRK': {'symbol': 'kn', 'name': 'Croatian Kuna'},
-            'RUB': {'symbol': '₽', 'name': 'Russian Ruble'},
-            'TRY': {'symbol': '₺', 'name': 'Turkish Lira'},
-            'ZAR': {'symbol': 'R', 'name': 'South African Rand'},
-            'BRL': {'symbol': 'R$', 'name': 'Brazilian Real'},
-            'MXN': {'symbol': 'Mex$', 'name': 'Mexican Peso'},
-            'ARS': {'symbol': 'AR$', 'name': 'Argentine Peso'},
-            'CLP': {'symbol': 'CLP$', 'name': 'Chilean Peso'},
-            'COP': {'symbol': 'COL$', 'name': 'Colombian Peso'},
-            'PEN': {'symbol': 'S/', 'name': 'Peruvian Sol'},
-            'KRW': {'symbol': '₩', 'name': 'South Korean Won'},
-            'THB': {'symbol': '฿', 'name': 'Thai Baht'},
-            'MYR': {'symbol': 'RM', 'name': 'Malaysian Ringgit'},
-            'IDR': {'symbol': 'Rp', 'name': 'Indonesian Rupiah'},
-            'PHP': {'symbol': '₱', 'name': 'Philippine Peso'},
-            'VND': {'symbol': '₫', 'name': 'Vietnamese Dong'},
-            'EGP': {'symbol': 'E£', 'name': 'Egyptian Pound'},
-            'NGN': {'symbol': '₦', 'name': 'Nigerian Naira'},
-            'KES': {'symbol': 'KSh', 'name': 'Kenyan Shilling'},
-            'MAD': {'symbol': 'DH', 'name': 'Moroccan Dirham'},
-            'TND': {'symbol': 'د.ت', 'name': 'Tunisian Dinar'},
-            'ILS': {'symbol': '₪', 'name': 'Israeli Shekel'},
-            'SAR': {'symbol': 'ر.س', 'name': 'Saudi Riyal'},
-            'QAR': {'symbol': 'ر.ق', 'name': 'Qatari Riyal'},
-            'KWD': {'symbol': 'د.ك', 'name': 'Kuwaiti Dinar'},
-            'BHD': {'symbol': '.د.ب', 'name': 'Bahraini Dinar'},
-            'OMR': {'symbol': 'ر.ع.', 'name': 'Omani Rial'},
-            'PKR': {'symbol': '₨', 'name': 'Pakistani Rupee'},
-            'LKR': {'symbol': 'Rs', 'name': 'Sri Lankan Rupee'},
-            'BDT': {'symbol': '৳', 'name': 'Bangladeshi Taka'},
-            'IQD': {'symbol': 'ع.د', 'name': 'Iraqi Dinar'},
-            'IRR': {'symbol': '﷼', 'name': 'Iranian Rial'}
-        }
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_entries=CACHE_MEMORY_ENTRIES, max_disk_bytes=CACHE_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if self.cache_dir:
+            make_private_dir(self.cache_dir)
+    
+    @staticmethod
+    def make_key(pdf_bytes):
+        """
+        Build the cache key for a PDF's raw bytes
+        """
+        return f"{hashlib.sha256(pdf_bytes).hexdigest()}-v{PARSER_VERSION}"
+    
+    @staticmethod
+    def with_options(key, **options):
+        """
+        Extend a content key with the processing options that change the
+        conversion result, so each combination is cached separately
+        """
+        options_digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+        return f"{key}-{options_digest}"
+    
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key):
+        """
+        Return the cached entry for key, or None
+        """
+        with self._lock:
+            # Memory tier
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            
+            # Disk tier
+            if not self.cache_dir:
+                return None
+            path = self._disk_path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                os.utime(path)  # Mark as recently used for eviction
+            except (OSError, ValueError):
+                return None
+            
+            self._remember(key, entry)
+            return entry
+    
+    def put(self, key, entry):
+        """
+        Store an entry in both tiers, evicting old entries as needed
+        """
+        with self._lock:
+            self._remember(key, entry)
+            if not self.cache_dir:
+                return
+            
+            path = self._disk_path(key)
+            tmp_path = f"{path}.tmp"
+            try:
+                with open_private(tmp_path) as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+                self._evict_disk()
+            except OSError:
+                # The disk tier is best effort; the memory tier still holds the entry
+                pass
+    
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _evict_disk(self):
+        """
+        Delete least recently used files until the disk tier fits its budget
+        """
+        files = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
         
-        self.currency_indicators = {
-            'AED': ['AED', 'د.إ', 'dirham', 'emirates', 'dubai', 'uae'],
-            'USD': ['USD', '$', 'dollar', 'usd', 'america', 'network'],
-            'EUR': ['EUR', '€', 'euro', 'europe', 'eur'],
-            'GBP': ['GBP', '£', 'pound', 'british', 'uk'],
-            'INR': ['INR', '₹', 'rupee', 'india', 'indian', 'inr'],
-            'JPY': ['JPY', '¥', 'yen', 'japan', 'japanese'],
-            'CNY': ['CNY', '¥', 'yuan', 'china', 'chinese'],
-            'CHF': ['CHF', 'franc', 'swiss', 'switzerland'],
-            'SAR': ['SAR', 'ر.س', 'riyals', 'saudi', 'riyadh']
-        }
+        for _, size, path in sorted(files):
+            if total_size <= self.max_disk_bytes:
+                break
+            try:
+                os.unlink(path)
+                total_size -= size
+            except OSError:
+                continue
+
+@st.cache_resource
+def get_conversion_cache():
+    """
+    Process-wide conversion cache shared across reruns and sessions
+    """
+    return ConversionCache()
+
+class LayoutTemplateStore:
+    """
+    Persists learned table column layouts per bank fingerprint, so later
+    statements from the same bank start with a known layout (kept in memory
+    only when there is no template_dir)
+    """
+    
+    def __init__(self, template_dir=TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self._templates = {}
+        self._lock = threading.Lock()
+        if self.template_dir:
+            make_private_dir(self.template_dir)
     
-    def extract_pdf_text(self, pdf_path):
+    def _path(self, bank):
+        return os.path.join(self.template_dir, f"{re.sub(r'[^A-Za-z0-9]+', '_', bank)}.json")
+    
+    def get(self, bank):
         """
-        Extract text from PDF using pdfplumber
+        Return the stored template for bank, or None
         """
-        try:
-            text_content = ""
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += page_text + "\n"
-            return text_content
-        except Exception as e:
-            st.error(f"Error reading PDF: {str(e)}")
-            return None
+        with self._lock:
+            if bank not in self._templates:
+                if not self.template_dir:
+                    return None
+                try:
+                    with open(self._path(bank), 'r', encoding='utf-8') as f:
+                        self._templates[bank] = json.load(f)
+                except (OSError, ValueError):
+                    return None
+            return self._templates[bank]
+    
+    def put(self, bank, template):
+        """
+        Remember a learned template for bank
+        """
+        with self._lock:
+            self._templates[bank] = template
+            if not self.template_dir:
+                return
+            try:
+                with open_private(self._path(bank)) as f:
+                    json.dump(template, f)
+            except OSError:
+                pass
+
+@st.cache_resource
+def get_template_store():
+    """
+    Process-wide store of learned table layouts
+    """
+    return LayoutTemplateStore()
+
+# Auto backend selection: how many pages to probe with the fast backend and
+# how many date + amount lines they must yield for its text to be trusted
+AUTO_PROBE_PAGES = 5
+AUTO_MIN_TRANSACTION_LINES = 3
+
+# Date shape of the generic transaction grammars (DD/MM/YYYY, MM-DD-YYYY, ...)
+GENERIC_DATE_PATTERN = r'\d{1,2}[-/]\d{1,2}[-/]\d{4}'
+# A three-letter month name, as in "1 Apr 2023" or "01-JAN-2024"
+MONTH_PATTERN = r'(?i:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)'
+# An amount in any supported number format (1,234.56 / 1.234,56 / 1'234.56)
+AMOUNT_RE = re.compile(r"(?<![\d.])[-+]?\d[\d,.'’]*[.,]\d{2}(?![\d.])")
+
+# Bank names and the currency their statements are usually in
+BANK_PATTERNS = MappingProxyType({
+    'HDFC': 'INR', 'ICICI': 'INR', 'SBI': 'INR', 'AXIS': 'INR',
+    'Emirates NBD': 'AED', 'FAB': 'AED', 'ADCB': 'AED',
+    'HSBC': 'USD', 'Citibank': 'USD', 'Chase': 'USD',
+    'Deutsche Bank': 'EUR', 'BNP Paribas': 'EUR'
+})
+
+# Table mode: header keywords mapped to the column they name
+TABLE_HEADER_KEYWORDS = {
+    'DATE': 'Date',
+    'DESCRIPTION': 'Description', 'DETAILS': 'Description', 'NARRATION': 'Description',
+    'PARTICULARS': 'Description', 'REMARKS': 'Description',
+    'DEBIT': 'Debit', 'DEBITS': 'Debit', 'WITHDRAWAL': 'Debit', 'WITHDRAWALS': 'Debit',
+    'CREDIT': 'Credit', 'CREDITS': 'Credit', 'DEPOSIT': 'Credit', 'DEPOSITS': 'Credit',
+    'AMOUNT': 'Amount',
+    'BALANCE': 'Balance'
+}
+TABLE_AMOUNT_COLUMNS = {'Debit', 'Credit', 'Amount'}
+# Words whose tops are within this many points belong to the same row
+TABLE_ROW_TOLERANCE = 3
+# How far (in points) a page's header may drift from the learned header band
+TABLE_HEADER_BAND_TOLERANCE = 20
+
+# Number formats: (amount inside a text line, amount as a single word,
+# thousands separators, decimal separator)
+NUMBER_FORMATS = {
+    'dot': (r'\d+[,\s]*\d*\.\d{2}', r'\d[\d,]*\.\d{2}', ', \t\xa0', '.'),           # 1,234.56
+    'comma': (r'\d+[.\s]*\d*,\d{2}', r'\d[\d.]*,\d{2}', '. \t\xa0', ','),           # 1.234,56
+    'apostrophe': (r"\d+['’\s]*\d*\.\d{2}", r"\d[\d'’]*\.\d{2}", "'’ \t\xa0", '.'),  # 1'234.56
+}
+
+# Transaction line grammars (date, description, amount[, balance]), compiled
+# once per number format into a single alternation. {amount} is replaced by
+# the format's amount pattern. Each grammar has its own named groups; the
+# last group of the grammar that matched (match.lastgroup) selects the fields.
+TRANSACTION_GRAMMARS = [
+    # From travel_company_converter.py patterns
+    r'(?P<from_date>\d{2}[-/]\d{2}[-/]\d{4})\s+(?P<from_desc>.*?)\s+(?P<from_amount>{amount})\s+From\s+(?P<from_balance>{amount})',
+    r'(?P<to_date>\d{2}[-/]\d{2}[-/]\d{4})\s+(?P<to_desc>.*?)\s+(?P<to_amount>{amount})\s+To\s+(?P<to_balance>{amount})',
+    # Date + description + amount + balance (also covers space-separated amounts)
+    r'(?P<bal_date>\d{1,2}[-/]\d{1,2}[-/]\d{4})\s+(?P<bal_desc>.*?)\s+(?P<bal_amount>{amount})\s*(?P<bal_balance>{amount})',
+    # Simple transaction line
+    r'(?P<simple_date>\d{1,2}[-/]\d{1,2}[-/]\d{4})\s+(?P<simple_desc>.*?)\s+(?P<simple_amount>[-+]?{amount})'
+]
+
+# Fields of each grammar, keyed by its last group
+TRANSACTION_FIELDS = {
+    'from_balance': ('from_date', 'from_desc', 'from_amount', 'from_balance'),
+    'to_balance': ('to_date', 'to_desc', 'to_amount', 'to_balance'),
+    'bal_balance': ('bal_date', 'bal_desc', 'bal_amount', 'bal_balance'),
+    'simple_amount': ('simple_date', 'simple_desc', 'simple_amount'),
+}
+
+class DateMatcher:
+    """
+    One regex for the dates of every registered grammar, generic and
+    bank-specific, so page triage, the auto-backend probe, the line
+    prefilter and table mode recognise exactly the dates the parsers
+    accept. Each date shape must stand alone, not inside a longer number.
+    Shapes keep the date formats of the grammar that registered them.
+    """
+    
+    def __init__(self, patterns):
+        self.patterns = []
+        # pattern -> (compiled pattern, date formats or None to infer them)
+        self.shapes = {}
+        self.regex = None
+        for pattern in patterns:
+            self.add(pattern)
+    
+    def add(self, pattern, formats=None):
+        """
+        Recognise one more date shape, written in the given date formats,
+        or in a format inferred from the statement's dates when None
+        """
+        if pattern not in self.patterns:
+            self.patterns.append(pattern)
+            self.shapes[pattern] = (re.compile(pattern), formats)
+            alternatives = '|'.join(f'(?:{pattern})' for pattern in self.patterns)
+            # Every date starts with a digit; the leading lookahead lets the
+            # regex engine skip straight to digits instead of trying each shape
+            self.regex = re.compile(rf'(?=\d)(?<!\d)(?:{alternatives})(?!\d)')
+    
+    def search(self, text, pos=0):
+        return self.regex.search(text, pos)
+    
+    def finditer(self, text):
+        return self.regex.finditer(text)
+    
+    def shape_of(self, date, preferred=None):
+        """
+        The first registered shape the whole date string has, trying the
+        preferred one (the statement bank's) first; None if it has none
+        """
+        for pattern in ([preferred] if preferred else []) + self.patterns:
+            if self.shapes[pattern][0].fullmatch(date):
+                return pattern
+        return None
+
+# Dates of all grammars; bank parsers add theirs when registered. Page
+# triage and the backend probe look for any of them
+STATEMENT_DATES = DateMatcher([GENERIC_DATE_PATTERN])
+# Dates the line parser accepts when no bank was fingerprinted; a bank's
+# statement also accepts that bank's dates (BankStatementParser.line_dates)
+GENERIC_DATES = DateMatcher([GENERIC_DATE_PATTERN])
+
+# Columns of a parsed transaction
+TRANSACTION_COLUMNS = ['Date', 'Description', 'Amount', 'Currency', 'Type', 'Balance']
+
+# Date formats tried on a statement's Date column once its separators are
+# normalized to '/', in order of preference when several fit equally well
+DATE_FORMATS = ['%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d', '%d/%m/%y', '%m/%d/%y', '%d/%b/%Y', '%d/%b/%y']
+DATE_SEPARATOR_RE = re.compile(r'[-.\s]+')
+
+# Characters of the statement used to fingerprint the bank when the text is
+# not split into pages (roughly the first page)
+FINGERPRINT_CHARS = 8 * 1024
+# Dates kept from that part of the statement (statement date, period) to
+# place dates printed without a year
+HEADER_DATES_MAX = 50
+
+OPENING_BALANCE_RE = re.compile(r'OPENING\s+BALANCE\D*?(\d[\d,]*\.\d{2})', re.IGNORECASE)
+
+# Characters of the statement sampled to detect its number format
+NUMBER_FORMAT_SAMPLE_CHARS = 64 * 1024
+
+class AmountNormalizer:
+    """
+    Converts amount strings of one number format to floats. The format is
+    detected once per statement; every amount is then converted with a
+    precomputed str.translate table that drops thousands separators,
+    whitespace and '$' and maps the decimal separator to '.'.
+    """
+    
+    def __init__(self, number_format):
+        amount_pattern, token_pattern, thousands, decimal = NUMBER_FORMATS[number_format]
+        self.number_format = number_format
+        self.table = str.maketrans({decimal: '.', '$': None, **{char: None for char in thousands}})
+        self.amount_re = re.compile(r'[-+]?' + amount_pattern)
+        self.token_re = re.compile(r'[-+]?' + token_pattern)
+        self.transaction_re = re.compile(
+            '|'.join(f'(?:{grammar})'.replace('{amount}', amount_pattern) for grammar in TRANSACTION_GRAMMARS),
+            re.IGNORECASE
+        )
+    
+    @staticmethod
+    def detect(text):
+        """
+        Return the normalizer for the number format most amounts in text use
+        (the 1,234.56 format when there is no clear majority)
+        """
+        votes = {number_format: 0 for number_format in NUMBER_FORMATS}
+        for token in AMOUNT_RE.findall(text[:NUMBER_FORMAT_SAMPLE_CHARS]):
+            if token[-3] == ',':
+                votes['comma'] += 1
+            elif "'" in token or '’' in token:
+                votes['apostrophe'] += 1
+            else:
+                votes['dot'] += 1
+        number_format = max(votes, key=lambda name: (votes[name], name == 'dot'))
+        return AMOUNT_NORMALIZERS[number_format]
+    
+    def to_float(self, amount):
+        """
+        Convert a single amount string
+        """
+        return float(amount.translate(self.table))
+    
+    def to_floats(self, amounts):
+        """
+        Convert a batch of amount strings
+        """
+        table = self.table
+        return [float(amount.translate(table)) for amount in amounts]
+    
+    def to_numeric(self, amounts):
+        """
+        Convert a Series of amount strings (NaN stays NaN)
+        """
+        return pd.to_numeric(amounts.str.translate(self.table))
+
+AMOUNT_NORMALIZERS = {number_format: AmountNormalizer(number_format) for number_format in NUMBER_FORMATS}
+DEFAULT_AMOUNTS = AMOUNT_NORMALIZERS['dot']
+
+class BankStatementParser:
+    """
+    Bank-specific line parser: one precompiled grammar with named groups
+    desc, amount and optionally balance / marker around a {date}
+    placeholder for the bank's date_pattern, the date_formats its dates
+    are written in (strptime formats of the date with its separators
+    normalized to '/', tried in order; formats without a year take the
+    statement's year) and the bank's convention for telling debits from
+    credits:
+      'balance' - direction from the running balance going down or up
+      'marker'  - a trailing Cr / Dr marker after the amount
+      'sign'    - negative amounts are debits
+    """
+    
+    def __init__(self, name, line_pattern, direction, date_pattern, date_formats):
+        self.name = name
+        self.date_pattern = date_pattern
+        self.date_formats = date_formats
+        self.line_dates = DateMatcher([GENERIC_DATE_PATTERN, date_pattern])
+        self.line_re = re.compile(line_pattern.replace('{date}', f'(?P<date>{date_pattern})'))
+        self.direction = direction
     
-    def detect_currency(self, text, context="general"):
+    def parse_line(self, line, primary_currency, state):
         """
-        Detect currency from text with multiple methods
+        Parse a stripped line, or return None if it is not in this bank's
+        format. state carries the running balance between lines.
         """
-        text_upper = text.upper()
+        match = self.line_re.match(line)
+        if not match:
+            # Seed the running balance from the opening balance line
+            if state.get('balance') is None:
+                opening = OPENING_BALANCE_RE.search(line)
+                if opening:
+                    state['balance'] = DEFAULT_AMOUNTS.to_float(opening.group(1))
+            return None
+        
+        fields = match.groupdict()
+        amount = DEFAULT_AMOUNTS.to_float(fields['amount'])
+        balance = DEFAULT_AMOUNTS.to_float(fields['balance']) if fields.get('balance') else None
         
-        # Method 1: Direct currency code matching
-        for currency, data in self.supported_currencies.items():
-            if currency in text_upper:
-                return currency
+        if self.direction == 'marker':
+            outgoing = (fields.get('marker') or '').upper() == 'DR'
+        elif self.direction == 'balance' and balance is not None and state.get('balance') is not None:
+            outgoing = balance < state['balance']
+        else:
+            outgoing = amount < 0
         
-        # Method 2: Currency symbol detection
-        currency_symbols = {
-            '$': 'USD',
-            '€': 'EUR', 
-            '£': 'GBP',
-            '₹': 'INR',
-            '¥': 'JPY',  # Could be CNY or JPY
-            'د.إ': 'AED',
-            'Fr': 'CHF'
+        if balance is not None:
+            state['balance'] = balance
+        
+        description = fields['desc'].strip()
+        return {
+            'Date': fields['date'],
+            'Description': description[:100] if description else "Transaction",
+            'Amount': -abs(amount) if outgoing else abs(amount),
+            'Currency': primary_currency,
+            'Type': "Outgoing" if outgoing else "Incoming",
+            'Balance': balance if balance is not None else 0
         }
+    
+    def parse_frame(self, lines, primary_currency):
+        """
+        Vectorized parse_line over a Series of stripped lines. Returns a
+        transactions DataFrame indexed like the lines it matched.
+        """
+        extracted = lines.str.extract(self.line_re)
+        matched = extracted['date'].notna() & lines.str.match(self.line_re)
+        rows = extracted[matched]
+        
+        amount = DEFAULT_AMOUNTS.to_numeric(rows['amount'])
+        if 'balance' in rows:
+            balance = DEFAULT_AMOUNTS.to_numeric(rows['balance'])
+        else:
+            balance = pd.Series(float('nan'), index=rows.index)
+        
+        if self.direction == 'marker':
+            outgoing = rows['marker'].fillna('').str.upper() == 'DR'
+        elif self.direction == 'balance':
+            # Compare with the previous known balance, seeded by the opening balance
+            previous = balance.ffill().shift()
+            opening = lines[~matched].str.extract(OPENING_BALANCE_RE)[0].dropna()
+            if not opening.empty and not rows.empty:
+                opening = opening[opening.index < rows.index[0]]
+                if not opening.empty:
+                    previous.iloc[0] = DEFAULT_AMOUNTS.to_float(opening.iloc[0])
+            outgoing = (balance < previous).where(balance.notna() & previous.notna(), amount < 0)
+        else:
+            outgoing = amount < 0
+        
+        outgoing = outgoing.astype(bool)
+        description = rows['desc'].str.strip()
+        return pd.DataFrame({
+            'Date': rows['date'],
+            'Description': description.where(description != '', "Transaction").str[:100],
+            'Amount': amount.abs().where(~outgoing, -amount.abs()),
+            'Currency': primary_currency,
+            'Type': outgoing.map({True: "Outgoing", False: "Incoming"}),
+            'Balance': balance.fillna(0)
+        })
+
+# Bank parsers keyed by the bank names in BANK_PATTERNS (the fingerprint)
+BANK_PARSERS = {}
+
+def register_bank_parser(parser):
+    """
+    Add a bank-specific parser to the registry, and its date shape to the
+    dates every stage recognises
+    """
+    BANK_PARSERS[parser.name] = parser
+    STATEMENT_DATES.add(parser.date_pattern, parser.date_formats)
+    return parser
+
+# Indian banks: one amount column filled per row followed by the closing
+# balance, so the balance movement gives the direction
+register_bank_parser(BankStatementParser(
+    'HDFC',
+    # Date, narration, [ref no.], value date, amount, closing balance
+    r'{date}\s+(?P<desc>.+?)\s+(?:\S+\s+)?\d{2}/\d{2}/\d{2}\s+(?P<amount>\d[\d,]*\.\d{2})\s+(?P<balance>\d[\d,]*\.\d{2})$',
+    'balance',
+    r'\d{2}/\d{2}/\d{2}',
+    ['%d/%m/%y']
+))
+register_bank_parser(BankStatementParser(
+    'ICICI',
+    # [S.No.], value date, [transaction date], remarks, amount, balance
+    r'(?:\d+\s+)?{date}\s+(?:\d{2}/\d{2}/\d{4}\s+)?(?P<desc>.+?)\s+(?P<amount>\d[\d,]*\.\d{2})\s+(?P<balance>\d[\d,]*\.\d{2})$',
+    'balance',
+    r'\d{2}/\d{2}/\d{4}',
+    ['%d/%m/%Y']
+))
+register_bank_parser(BankStatementParser(
+    'SBI',
+    # Txn date and value date as "1 Apr 2023", description, amount, balance
+    r'{date}\s+(?:\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+)?(?P<desc>.+?)\s+(?P<amount>\d[\d,]*\.\d{2})\s+(?P<balance>\d[\d,]*\.\d{2})$',
+    'balance',
+    rf'\d{{1,2}}\s+{MONTH_PATTERN}\s+\d{{4}}',
+    ['%d/%b/%Y']
+))
+register_bank_parser(BankStatementParser(
+    'AXIS',
+    # Date, particulars, amount, balance, [branch code]
+    r'{date}\s+(?P<desc>.+?)\s+(?P<amount>\d[\d,]*\.\d{2})\s+(?P<balance>\d[\d,]*\.\d{2})(?:\s+\d+)?$',
+    'balance',
+    r'\d{2}-\d{2}-\d{4}',
+    ['%d/%m/%Y']
+))
+
+# UAE banks: amount followed by the running balance with a Cr / Dr marker
+for _uae_bank in ('Emirates NBD', 'FAB', 'ADCB'):
+    register_bank_parser(BankStatementParser(
+        _uae_bank,
+        r'{date}\s+(?P<desc>.+?)\s+(?P<amount>\d[\d,]*\.\d{2})\s+(?P<balance>\d[\d,]*\.\d{2})\s*(?:Cr|CR|Dr|DR)?$',
+        'balance',
+        rf'\d{{2}}[-/](?:\d{{2}}|{MONTH_PATTERN})[-/]\d{{4}}',
+        ['%d/%m/%Y', '%d/%b/%Y']
+    ))
+
+# HSBC: "01 Jan 24" dates, paid out / paid in then an optional balance
+register_bank_parser(BankStatementParser(
+    'HSBC',
+    r'{date}\s+(?P<desc>.+?)\s+(?P<amount>\d[\d,]*\.\d{2})(?:\s+(?P<balance>\d[\d,]*\.\d{2}))?$',
+    'balance',
+    rf'\d{{2}}\s+{MONTH_PATTERN}\s+\d{{2}}(?:\d{{2}})?',
+    ['%d/%b/%y', '%d/%b/%Y']
+))
+
+# US banks: MM/DD dates and signed amounts
+for _us_bank in ('Citibank', 'Chase'):
+    register_bank_parser(BankStatementParser(
+        _us_bank,
+        r'{date}\s+(?P<desc>.+?)\s+(?P<amount>-?\$?\d[\d,]*\.\d{2})(?:\s+(?P<balance>-?\$?\d[\d,]*\.\d{2}))?$',
+        'sign',
+        r'\d{2}/\d{2}(?:/\d{2}(?:\d{2})?)?',
+        # Statements often print the year once in the header
+        ['%m/%d/%Y', '%m/%d/%y', '%m/%d']
+    ))
+
+# Debit / credit keywords per statement language: (outgoing, incoming)
+DIRECTION_KEYWORDS = {
+    'en': (
+        ['TO', 'PAID', 'TRANSFER', 'PURCHASE', 'OUTWARD', 'DEBIT'],
+        ['FROM', 'INWARD', 'CREDIT', 'RECEIVED']
+    ),
+    'de': (
+        ['AN', 'LASTSCHRIFT', 'KARTENZAHLUNG', 'AUSZAHLUNG', 'DAUERAUFTRAG', 'ÜBERWEISUNG AN'],
+        ['VON', 'GUTSCHRIFT', 'GEHALT', 'EINZAHLUNG', 'ÜBERWEISUNG VON']
+    ),
+    'fr': (
+        ['PRELEVEMENT', 'PRÉLÈVEMENT', 'PAIEMENT', 'RETRAIT', 'VIREMENT EMIS', 'VIREMENT ÉMIS'],
+        ['VERSEMENT', 'REMISE', 'VIREMENT RECU', 'VIREMENT REÇU', 'SALAIRE']
+    ),
+}
+
+# Statement language of banks that don't write in English
+BANK_LANGUAGES = {'Deutsche Bank': 'de', 'BNP Paribas': 'fr'}
+
+class KeywordClassifier:
+    """
+    Classifies a line as Outgoing / Incoming from debit / credit keywords
+    in a single scan of one precompiled alternation, with the outgoing and
+    incoming keywords in named groups 'out' and 'in'. Keywords only match
+    as whole words (so 'TO' does not match inside 'TOTAL' or 'TOYOTA') and
+    case-insensitively; an outgoing keyword anywhere in the line wins.
+    """
+    
+    def __init__(self, outgoing, incoming):
+        self.outgoing = [keyword.upper() for keyword in outgoing]
+        self.incoming = [keyword.upper() for keyword in incoming]
+        self.keyword_re = re.compile(
+            r'\b(?:(?P<out>' + self._alternation(self.outgoing) + r')|(?P<in>' + self._alternation(self.incoming) + r'))\b',
+            re.IGNORECASE
+        )
+    
+    @staticmethod
+    def _alternation(keywords):
+        # Longest keywords first so multi-word keywords beat their first word
+        return '|'.join(re.escape(keyword) for keyword in sorted(set(keywords), key=len, reverse=True))
+    
+    def classify(self, text):
+        """
+        Return (transaction type, matched keyword), or (None, None) when
+        the text contains no keyword
+        """
+        incoming_keyword = None
+        for match in self.keyword_re.finditer(text):
+            if match.lastgroup == 'out':
+                return "Outgoing", match.group().upper()
+            if incoming_keyword is None:
+                incoming_keyword = match.group().upper()
+        if incoming_keyword is not None:
+            return "Incoming", incoming_keyword
+        return None, None
+    
+    def classify_series(self, texts):
+        """
+        classify over a Series of texts, with the regex scan done by
+        Series.str.findall. Returns a Series of transaction types and one
+        of matched keywords (None where no keyword matched).
+        """
+        types = []
+        keywords = []
+        for found in texts.str.findall(self.keyword_re):
+            outgoing = next((out for out, _ in found if out), None)
+            if outgoing is not None:
+                types.append("Outgoing")
+                keywords.append(outgoing.upper())
+            elif found:
+                types.append("Incoming")
+                keywords.append(found[0][1].upper())
+            else:
+                types.append(None)
+                keywords.append(None)
+        return pd.Series(types, index=texts.index, dtype=object), pd.Series(keywords, index=texts.index, dtype=object)
+
+DIRECTION_CLASSIFIERS = {
+    language: KeywordClassifier(outgoing, incoming)
+    for language, (outgoing, incoming) in DIRECTION_KEYWORDS.items()
+}
+DEFAULT_CLASSIFIER = DIRECTION_CLASSIFIERS['en']
+
+# Classifiers for banks with their own keywords, keyed by bank name
+BANK_CLASSIFIERS = {}
+
+def register_direction_keywords(bank, outgoing=(), incoming=()):
+    """
+    Give a bank extra debit / credit keywords on top of its language's
+    """
+    language_outgoing, language_incoming = DIRECTION_KEYWORDS[BANK_LANGUAGES.get(bank, 'en')]
+    BANK_CLASSIFIERS[bank] = KeywordClassifier(
+        language_outgoing + list(outgoing), language_incoming + list(incoming)
+    )
+    return BANK_CLASSIFIERS[bank]
+
+def get_direction_classifier(bank=None):
+    """
+    Keyword classifier for a fingerprinted bank (English when unknown)
+    """
+    if bank in BANK_CLASSIFIERS:
+        return BANK_CLASSIFIERS[bank]
+    return DIRECTION_CLASSIFIERS[BANK_LANGUAGES.get(bank, 'en')]
+
+register_direction_keywords('HDFC', outgoing=['NEFT DR', 'IMPS DR', 'ATW', 'POS'], incoming=['NEFT CR', 'IMPS CR'])
+register_direction_keywords('ICICI', outgoing=['ATM', 'POS'], incoming=['NEFT CR', 'INT.PD'])
+
+# Currencies the converter knows, with their symbol and name
+SUPPORTED_CURRENCIES = MappingProxyType({
+    code: MappingProxyType(data) for code, data in {
+        'USD': {'symbol': '$', 'name': 'US Dollar'},
+        'EUR': {'symbol': '€', 'name': 'Euro'},
+        'GBP': {'symbol': '£', 'name': 'British Pound'},
+        'JPY': {'symbol': '¥', 'name': 'Japanese Yen'},
+        'CNY': {'symbol': '¥', 'name': 'Chinese Yuan'},
+        'INR': {'symbol': '₹', 'name': 'Indian Rupee'},
+        'AED': {'symbol': 'د.إ', 'name': 'UAE Dirham'},
+        'SAR': {'symbol': 'ر.س', 'name': 'Saudi Riyal'},
+        'CHF': {'symbol': 'Fr', 'name': 'Swiss Franc'},
+        'CAD': {'symbol': 'C$', 'name': 'Canadian Dollar'},
+        'AUD': {'symbol': 'A$', 'name': 'Australian Dollar'},
+        'SGD': {'symbol': 'S$', 'name': 'Singapore Dollar'},
+        'HKD': {'symbol': 'HK$', 'name': 'Hong Kong Dollar'},
+        'NZD': {'symbol': 'NZ$', 'name': 'New Zealand Dollar'},
+        'SEK': {'symbol': 'kr', 'name': 'Swedish Krona'},
+        'NOK': {'symbol': 'kr', 'name': 'Norwegian Krone'},
+        'DKK': {'symbol': 'kr', 'name': 'Danish Krone'},
+        'PLN': {'symbol': 'zł', 'name': 'Polish Zloty'},
+        'CZK': {'symbol': 'Kč', 'name': 'Czech Koruna'},
+        'HUF': {'symbol': 'Ft', 'name': 'Hungarian Forint'},
+        'RON': {'symbol': 'lei', 'name': 'Romanian Leu'},
+        'BGN': {'symbol': 'лв', 'name': 'Bulgarian Lev'},
+        'HRK': {'symbol': 'kn', 'name': 'Croatian Kuna'},
+        'RUB': {'symbol': '₽', 'name': 'Russian Ruble'},
+        'TRY': {'symbol': '₺', 'name': 'Turkish Lira'},
+        'ZAR': {'symbol': 'R', 'name': 'South African Rand'},
+        'BRL': {'symbol': 'R$', 'name': 'Brazilian Real'},
+        'MXN': {'symbol': 'Mex$', 'name': 'Mexican Peso'},
+        'ARS': {'symbol': 'AR$', 'name': 'Argentine Peso'},
+        'CLP': {'symbol': 'CLP$', 'name': 'Chilean Peso'},
+        'COP': {'symbol': 'COL$', 'name': 'Colombian Peso'},
+        'PEN': {'symbol': 'S/', 'name': 'Peruvian Sol'},
+        'KRW': {'symbol': '₩', 'name': 'South Korean Won'},
+        'THB': {'symbol': '฿', 'name': 'Thai Baht'},
+        'MYR': {'symbol': 'RM', 'name': 'Malaysian Ringgit'},
+        'IDR': {'symbol': 'Rp', 'name': 'Indonesian Rupiah'},
+        'PHP': {'symbol': '₱', 'name': 'Philippine Peso'},
+        'VND': {'symbol': '₫', 'name': 'Vietnamese Dong'},
+        'EGP': {'symbol': 'E£', 'name': 'Egyptian Pound'},
+        'NGN': {'symbol': '₦', 'name': 'Nigerian Naira'},
+        'KES': {'symbol': 'KSh', 'name': 'Kenyan Shilling'},
+        'MAD': {'symbol': 'DH', 'name': 'Moroccan Dirham'},
+        'TND': {'symbol': 'د.ت', 'name': 'Tunisian Dinar'},
+        'ILS': {'symbol': '₪', 'name': 'Israeli Shekel'},
+        'QAR': {'symbol': 'ر.ق', 'name': 'Qatari Riyal'},
+        'KWD': {'symbol': 'د.ك', 'name': 'Kuwaiti Dinar'},
+        'BHD': {'symbol': '.د.ب', 'name': 'Bahraini Dinar'},
+        'OMR': {'symbol': 'ر.ع.', 'name': 'Omani Rial'},
+        'PKR': {'symbol': '₨', 'name': 'Pakistani Rupee'},
+        'LKR': {'symbol': 'Rs', 'name': 'Sri Lankan Rupee'},
+        'BDT': {'symbol': '৳', 'name': 'Bangladeshi Taka'},
+        'IQD': {'symbol': 'ع.د', 'name': 'Iraqi Dinar'},
+        'IRR': {'symbol': '﷼', 'name': 'Iranian Rial'}
+    }.items()
+})
+
+# Words that hint at each currency
+CURRENCY_INDICATORS = MappingProxyType({
+    'AED': ('AED', 'د.إ', 'dirham', 'emirates', 'dubai', 'uae'),
+    'USD': ('USD', '$', 'dollar', 'usd', 'america', 'network'),
+    'EUR': ('EUR', '€', 'euro', 'europe', 'eur'),
+    'GBP': ('GBP', '£', 'pound', 'british', 'uk'),
+    'INR': ('INR', '₹', 'rupee', 'india', 'indian', 'inr'),
+    'JPY': ('JPY', '¥', 'yen', 'japan', 'japanese'),
+    'CNY': ('CNY', '¥', 'yuan', 'china', 'chinese'),
+    'CHF': ('CHF', 'franc', 'swiss', 'switzerland'),
+    'SAR': ('SAR', 'ر.س', 'riyals', 'saudi', 'riyadh')
+})
+
+# Currency detection: place names that imply the account currency
+REGIONAL_CURRENCIES = MappingProxyType({
+    'Mumbai': 'INR', 'Delhi': 'INR', 'India': 'INR', 'Bangalore': 'INR',
+    'Dubai': 'AED', 'Abu Dhabi': 'AED', 'UAE': 'AED', 'Emirates': 'AED',
+    'London': 'GBP', 'UK': 'GBP', 'Britain': 'GBP', 'Manchester': 'GBP',
+    'Berlin': 'EUR', 'Paris': 'EUR', 'Rome': 'EUR', 'Europe': 'EUR',
+    'Tokyo': 'JPY', 'Osaka': 'JPY', 'Japan': 'JPY',
+    'Beijing': 'CNY', 'Shanghai': 'CNY', 'China': 'CNY'
+})
+# Symbols shared by several currencies, resolved to the most likely one
+CURRENCY_SYMBOL_OVERRIDES = MappingProxyType({'$': 'USD', '¥': 'JPY', 'Fr': 'CHF'})
+
+def _currency_symbol_index():
+    """
+    Reverse index from symbol to currency: symbols unique to one currency
+    plus the overrides. Plain-letter symbols (R, kr, Rs, ...) are too
+    ambiguous to count as evidence.
+    """
+    symbol_counts = {}
+    for data in SUPPORTED_CURRENCIES.values():
+        symbol_counts[data['symbol']] = symbol_counts.get(data['symbol'], 0) + 1
+    index = {
+        data['symbol']: code for code, data in SUPPORTED_CURRENCIES.items()
+        if symbol_counts[data['symbol']] == 1 and not data['symbol'].isalpha()
+    }
+    index.update(CURRENCY_SYMBOL_OVERRIDES)
+    return MappingProxyType(index)
+
+CURRENCY_BY_SYMBOL = _currency_symbol_index()
+# Weight of one piece of evidence by how it was found
+CURRENCY_EVIDENCE_WEIGHTS = {'code': 3, 'bank': 3, 'symbol': 2, 'region': 1}
+# Stop scanning once the leading currency is this many points ahead
+CURRENCY_DECISIVE_LEAD = 30
+# Bounded detection: the account currency is almost always stated in the
+# statement header or its account summary, so only the first
+# CURRENCY_HEADER_CHARS (or CURRENCY_HEADER_PAGES pages when streaming) and
+# the summary block are scanned, widening while confidence stays below
+# CURRENCY_MIN_CONFIDENCE
+CURRENCY_HEADER_CHARS = 16 * 1024
+CURRENCY_HEADER_PAGES = 3
+CURRENCY_MIN_CONFIDENCE = 0.6
+CURRENCY_WIDEN_FACTOR = 4
+ACCOUNT_SUMMARY_RE = re.compile(
+    r'ACCOUNT\s+SUMMARY|STATEMENT\s+SUMMARY|SUMMARY\s+OF\s+ACCOUNT|ACCOUNT\s+CURRENCY|CURRENCY\s*:',
+    re.IGNORECASE
+)
+CURRENCY_SUMMARY_CHARS = 2 * 1024
+# Parsed rows whose currency is tagged together in one vectorized pass
+CURRENCY_TAG_BATCH = 1024
+
+class CurrencyDetector:
+    """
+    Scores currencies from one scan of the text with a single compiled
+    matcher over currency codes, symbols, place names and bank names.
+    Tokens only match at word boundaries, so 'PEN' is not found in
+    'OPENING', 'Fr' in 'From' nor 'S/' in 'IMPS/' or 'S/O'.
+    """
+    
+    def __init__(self, codes, symbols, regions, banks):
+        # token -> (currency, evidence kind)
+        self.tokens = {code: (code, 'code') for code in codes}
+        for symbol, code in symbols.items():
+            self.tokens[symbol] = (code, 'symbol')
+        for region, code in regions.items():
+            self.tokens.setdefault(region, (code, 'region'))
+        for bank, code in banks.items():
+            self.tokens[bank] = (code, 'bank')
+        
+        self.token_re = self._compile(self.tokens)
         
-        for symbol, currency in currency_symbols.items():
-            if symbol in text:
-                return currency
-        
-        # Method 3: Regional keyword inference
-        regional_patterns = {
-            'Mumbai': 'INR', 'Delhi': 'INR', 'India': 'INR', 'Bangalore': 'INR',
-            'Dubai': 'AED', 'Abu Dhabi': 'AED', 'UAE': 'AED', 'Emirates': 'AED',
-            'London': 'GBP', 'UK': 'GBP', 'Britain': 'GBP', 'Manchester': 'GBP',
-            'Berlin': 'EUR', 'Paris': 'EUR', 'Rome': 'EUR', 'Europe': 'EUR',
-            'Tokyo': 'JPY', 'Osaka': 'JPY', 'Japan': 'JPY',
-            'Beijing': 'CNY', 'Shanghai': 'CNY', 'China': 'CNY'
+        # Per-row tagging only trusts currency codes and symbols
+        self.row_tokens = {
+            token: code for token, (code, kind) in self.tokens.items() if kind in ('code', 'symbol')
         }
+        self.row_re = self._compile(self.row_tokens)
         
-        for region, currency in regional_patterns.items():
-            if region in text:
-                return currency
+        # Bank fingerprinting: bank names in any case, keyed by their lower case
+        self.bank_names = {bank.lower(): bank for bank in banks}
+        self.bank_re = self._compile(banks, re.IGNORECASE)
+    
+    @staticmethod
+    def _compile(tokens, flags=0):
+        """
+        One capturing alternation over tokens, grouped by first character
+        so the engine tries one branch per position, and longest first
+        within a group so 'Emirates NBD' beats 'Emirates'. A token that
+        starts with a letter or digit must not follow one ('S/' is not in
+        'IMPS/'), and one that ends with a letter or digit must not be
+        followed by one. Any token must not be followed by a letter
+        ('S/' is not in 'S/O', "son of"). The boundaries are checked after the literal (a
+        fixed-width lookbehind instead of a leading \\b, which would stop
+        the engine from skipping ahead on first characters).
+        """
+        groups = {}
+        for token in sorted(tokens, key=len, reverse=True):
+            alternative = re.escape(token[1:])
+            if token[0].isalnum():
+                alternative += r'(?<!\w' + '.' * len(token) + ')'
+            if token[-1].isalnum():
+                alternative += r'(?!\w)'
+            else:
+                alternative += r'(?![^\W\d_])'
+            groups.setdefault(token[0], []).append(alternative)
+        return re.compile('(' + '|'.join(
+            re.escape(first) + '(?:' + '|'.join(alternatives) + ')' for first, alternatives in groups.items()
+        ) + ')', flags)
+    
+    def scan(self, text, scores=None):
+        """
+        Return a dict with the best currency (None without evidence), its
+        confidence (share of all evidence) and the ranking of
+        (currency, score) pairs. Passing the scores dict of an earlier scan
+        adds this text's evidence to it.
+        """
+        if scores is None:
+            scores = {}
+        for match in self.token_re.finditer(text):
+            currency, kind = self.tokens[match.group()]
+            score = scores.get(currency, 0) + CURRENCY_EVIDENCE_WEIGHTS[kind]
+            scores[currency] = score
+            if score >= CURRENCY_DECISIVE_LEAD:
+                runner_up = max((other for code, other in scores.items() if code != currency), default=0)
+                if score - runner_up >= CURRENCY_DECISIVE_LEAD:
+                    break
         
-        # Method 4: Bank-specific patterns
-        bank_patterns = {
-            'HDFC': 'INR', 'ICICI': 'INR', 'SBI': 'INR', 'AXIS': 'INR',
-            'Emirates NBD': 'AED', 'FAB': 'AED', 'ADCB': 'AED',
-            'HSBC': 'USD', 'Citibank': 'USD', 'Chase': 'USD',
-            'Deutsche Bank': 'EUR', 'BNP Paribas': 'EUR'
+        # Ties keep the currency that was seen first
+        ranking = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        total = sum(scores.values())
+        return {
+            'currency': ranking[0][0] if ranking else None,
+            'confidence': ranking[0][1] / total if total else 0.0,
+            'ranking': ranking,
         }
+    
+    def tag_rows(self, lines, default_currency):
+        """
+        Currency of each line in a Series from the first currency code or
+        symbol it contains, default_currency for lines without one. The
+        lines are joined and scanned once; match offsets are mapped back to
+        rows with a binary search instead of running the regex per row.
+        """
+        currencies = np.full(len(lines), default_currency, dtype=object)
+        if len(lines):
+            lengths = lines.str.len().to_numpy() + 1
+            starts = np.cumsum(lengths) - lengths
+            positions, tokens = [], []
+            for match in self.row_re.finditer("\n".join(lines)):
+                positions.append(match.start())
+                tokens.append(match.group())
+            if positions:
+                rows = np.searchsorted(starts, positions, side='right') - 1
+                # Each row keeps its first match
+                rows, first = np.unique(rows, return_index=True)
+                currencies[rows] = [self.row_tokens[tokens[index]] for index in first]
+        return pd.Series(currencies, index=lines.index)
+    
+    def find_bank(self, text):
+        """
+        The bank named most often in the text as a whole word (so 'AXIS' is
+        not found in 'TAXIS' nor 'FAB' in 'FABINDIA'), the earliest named
+        on a tie, or None
+        """
+        counts = {}
+        for match in self.bank_re.finditer(text):
+            bank = self.bank_names[match.group().lower()]
+            counts[bank] = counts.get(bank, 0) + 1
+        # Dicts keep first-seen order and max() keeps the first of equals
+        return max(counts, key=counts.get, default=None)
+
+CURRENCY_DETECTOR = CurrencyDetector(SUPPORTED_CURRENCIES, CURRENCY_BY_SYMBOL, REGIONAL_CURRENCIES, BANK_PATTERNS)
+
+class UniversalBankConverter:
+    """
+    Universal Bank Statement Converter for Streamlit App
+    """
+    
+    def __init__(self):
+        # Lookup tables and matchers are frozen module-level structures,
+        # built once per process
+        self.supported_currencies = SUPPORTED_CURRENCIES
+        self.currency_indicators = CURRENCY_INDICATORS
+        self.currency_detector = CURRENCY_DETECTOR
+    
+    def iter_pdf_pages(self, pdf_source, workers=1, chunk_size=None, backend='pdfplumber', page_indices=None, reopen_every=None, executor=None):
+        """
+        Yield the text of each PDF page one at a time using the given
+        extraction backend ('pdfplumber', 'pypdf2' or 'auto').
+        pdf_source may be a path, bytes / memoryview, or a file-like object
+        such as an upload buffer or mmap, so uploads never touch the disk.
+        page_indices restricts extraction to those 0-based pages.
+        reopen_every reopens the document every N pages to bound memory.
+        With workers > 1 the page range is extracted in parallel processes,
+        in executor (a process pool shared with other statements) if given.
+        """
+        if backend == 'auto':
+            backend = self.select_backend(pdf_source)
+        
+        if workers > 1:
+            yield from self._iter_pdf_pages_parallel(
+                pdf_source, workers, chunk_size, backend, page_indices, reopen_every=reopen_every, executor=executor
+            )
+            return
+        
+        for page_text in get_backend(backend).iter_pages(pdf_source, page_indices, reopen_every):
+            if page_text:
+                yield page_text
+    
+    def select_backend(self, pdf_source):
+        """
+        Auto mode: probe the first pages with the fast backend and keep it
+        only if its text passes the quality check, else fall back to pdfplumber
+        """
+        probe_pages = get_backend(FAST_BACKEND).iter_pages(pdf_source, range(AUTO_PROBE_PAGES))
+        transaction_lines = 0
+        
+        for page_text in probe_pages:
+            for line in page_text.split('\n'):
+                if STATEMENT_DATES.search(line) and AMOUNT_RE.search(line):
+                    transaction_lines += 1
+            if transaction_lines >= AUTO_MIN_TRANSACTION_LINES:
+                return FAST_BACKEND
+        
+        return ROBUST_BACKEND
+    
+    def triage_pages(self, pdf_source):
+        """
+        Classify pages cheaply from a fast raw-text pass and return the
+        indices of pages likely to hold transaction rows, plus the page count.
+        The first page is always kept for the header and currency details,
+        and pages with no raw text are kept because they cannot be judged.
+        """
+        kept_pages = []
+        page_count = 0
+        
+        for page_index, raw_text in enumerate(get_backend(FAST_BACKEND).iter_pages(pdf_source)):
+            page_count += 1
+            if page_index == 0 or not raw_text.strip() or STATEMENT_DATES.search(raw_text):
+                kept_pages.append(page_index)
+        
+        return kept_pages, page_count
+    
+    def iter_pdf_page_words(self, pdf_source, workers=1, chunk_size=None, page_indices=None, reopen_every=None, executor=None):
+        """
+        Yield the positioned words of each page (pdfplumber only), for the
+        geometry-based table mode
+        """
+        if workers > 1:
+            yield from self._iter_pdf_pages_parallel(
+                pdf_source, workers, chunk_size, ROBUST_BACKEND, page_indices, words=True, reopen_every=reopen_every, executor=executor
+            )
+            return
+        
+        for words in get_backend(ROBUST_BACKEND).iter_page_words(pdf_source, page_indices, reopen_every):
+            if words:
+                yield words
+    
+    def _iter_pdf_pages_parallel(self, pdf_source, workers, chunk_size=None, backend='pdfplumber', page_indices=None, words=False, reopen_every=None, executor=None):
+        """
+        Split the page range into chunks, extract each chunk in a worker
+        process (each opens the PDF independently) and yield pages in order.
+        Every chunk is a fresh open, so reopen_every caps the chunk size.
+        With a shared executor the chunks join the other statements' work in
+        that pool instead of starting a pool for this PDF alone.
+        """
+        if page_indices is None:
+            page_indices = range(get_backend(backend).count_pages(pdf_source))
+        page_indices = list(page_indices)
+        if not page_indices:
+            return
+        
+        # Default to ~4 chunks per worker so uneven pages still balance out;
+        # in a shared pool the other statements' chunks already balance it
+        if not chunk_size:
+            chunks_per_worker = 1 if executor is not None else 4
+            chunk_size = max(1, math.ceil(len(page_indices) / (workers * chunks_per_worker)))
+        if reopen_every:
+            chunk_size = min(chunk_size, reopen_every)
+        
+        page_chunks = [
+            page_indices[start:start + chunk_size]
+            for start in range(0, len(page_indices), chunk_size)
+        ]
+        
+        # Paths are reopened by each worker; in-memory PDFs are sent once per
+        # worker, or with every chunk when the pool is shared
+        if isinstance(pdf_source, (str, os.PathLike)):
+            task_source, initializer, initargs = pdf_source, None, ()
+        elif executor is not None:
+            task_source, initializer, initargs = pdf_bytes(pdf_source), None, ()
+        else:
+            task_source, initializer, initargs = None, init_worker, (pdf_bytes(pdf_source),)
         
-        for bank, currency in bank_patterns.items():
-            if bank in text:
-                return currency
+        if executor is not None:
+            futures = [
+                executor.submit(extract_pages, task_source, page_chunk, backend, words)
+                for page_chunk in page_chunks
+            ]
+            try:
+                for future in futures:
+                    for page in future.result():
+                        if page:
+                            yield page
+            finally:
+                # The pool outlives this PDF; only drop its pending chunks
+                for future in futures:
+                    future.cancel()
+            return
+        
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(page_chunks)),
+            initializer=initializer,
+            initargs=initargs
+        )
+        try:
+            futures = [
+                executor.submit(extract_pages, task_source, page_chunk, backend, words)
+                for page_chunk in page_chunks
+            ]
+            # Merge back in page order
+            for future in futures:
+                for page in future.result():
+                    if page:
+                        yield page
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def extract_pdf_text(self, pdf_source, workers=1, chunk_size=None, backend='pdfplumber'):
+        """
+        Extract text from PDF using the selected backend (pdfplumber by default)
+        """
+        try:
+            return "".join(
+                page_text + "\n"
+                for page_text in self.iter_pdf_pages(
+                    pdf_source, workers=workers, chunk_size=chunk_size, backend=backend
+                )
+            )
+        except Exception as e:
+            st.error(f"Error reading PDF: {str(e)}")
+            return None
+
+    def detect_currency(self, text, context="general", window=CURRENCY_HEADER_CHARS):
+        """
+        Detect currency from text with multiple methods. Only the first
+        window characters and the account summary are scanned unless the
+        evidence there is inconclusive; window=None scans all of the text.
+        """
+        # Methods 1-4: currency codes, symbols, regional keywords and bank
+        # names, scored together in one scan
+        detection = self.score_currency(text, window)
+        if detection['currency']:
+            return detection['currency']
         
         # Method 5: Context-based analysis
         if context == "mexico":
@@ -218,195 +1221,1481 @@ class UniversalBankConverter:
         # Default to USD if no specific match
         return "USD"
     
-    def extract_transactions_from_pdf_text(self, pdf_text):
+    def score_currency(self, text, window=None):
         """
-        Extract transactions from PDF text using intelligent parsing
+        Ranked currency evidence for text: currency, confidence and ranking.
+        With a window, scan the header and the account summary block first
+        and widen the scan only while confidence is low.
         """
-        transactions = []
+        if window is None or len(text) <= window:
+            return self.currency_detector.scan(text)
+        
+        scores = {}
+        detection = self.currency_detector.scan(text[:window], scores)
+        if detection['currency'] and detection['confidence'] >= CURRENCY_MIN_CONFIDENCE:
+            return detection
         
+        # Inconclusive header: add the account summary block, then widen
+        summary = ACCOUNT_SUMMARY_RE.search(text, window)
+        if summary:
+            detection = self.currency_detector.scan(text[summary.start():summary.start() + CURRENCY_SUMMARY_CHARS], scores)
+        
+        start = window
+        while (not detection['currency'] or detection['confidence'] < CURRENCY_MIN_CONFIDENCE) and start < len(text):
+            window = start * CURRENCY_WIDEN_FACTOR
+            detection = self.currency_detector.scan(text[start:window], scores)
+            start = window
+        return detection
+    
+    def detect_bank(self, text):
+        """
+        Fingerprint the issuing bank from its name in the text
+        """
+        return self.currency_detector.find_bank(text)
+    
+    def record_header_dates(self, header_text, line_stats):
+        """
+        Keep the dates at the start of the statement (its statement date or
+        period) in line_stats['header_dates'], so parse_dates can place
+        dates that are printed without a year
+        """
+        if line_stats is not None:
+            matches = STATEMENT_DATES.finditer(header_text[:FINGERPRINT_CHARS])
+            line_stats['header_dates'] = [match.group() for match in itertools.islice(matches, HEADER_DATES_MAX)]
+    
+    def extract_transactions_from_pdf_text(self, pdf_text, line_stats=None):
+        """
+        Extract transactions from PDF text using intelligent parsing
+        """
         # Detect primary currency
         primary_currency = self.detect_currency(pdf_text)
         
+        # Pick a bank-specific parser from the start of the statement
+        bank = self.detect_bank(pdf_text[:FINGERPRINT_CHARS])
+        self.record_header_dates(pdf_text, line_stats)
+        bank_parser = BANK_PARSERS.get(bank)
+        normalizer = AmountNormalizer.detect(pdf_text)
+        
         # Split text into lines
         lines = pdf_text.split('\n')
         
-        # Improved transaction detection patterns
-        transaction_patterns = [
-            # From travel_company_converter.py patterns
-            r'(\d{2}[-/]\d{2}[-/]\d{4})\s+(.*?)\s+(\d+[,\s]*\d*\.\d{2})\s+From\s+(\d+[,\s]*\d*\.\d{2})',
-            r'(\d{2}[-/]\d{2}[-/]\d{4})\s+(.*?)\s+(\d+[,\s]*\d*\.\d{2})\s+To\s+(\d+[,\s]*\d*\.\d{2})',
-            # Generic date + description + amount patterns
-            r'(\d{1,2}[-/]\d{1,2}[-/]\d{4})\s+(.*?)\s+(\d+[,\s]*\d*\.\d{2})\s*(\d+[,\s]*\d*\.\d{2})',
-            # Date with balance patterns
-            r'(\d{1,2}[-/]\d{1,2}[-/]\d{4})\s+(.*?)\s+(\d+[,\s]*\d*\.\d{2})\s+(\d+[,\s]*\d*\.\d{2})',
-            # Simple transaction line
-            r'(\d{1,2}[-/]\d{1,2}[-/]\d{4})\s+(.*?)\s+([-+]?\d+[,\s]*\d*\.\d{2})'
+        transactions = list(self.iter_transactions(
+            lines, primary_currency, line_stats, bank_parser,
+            normalizer=normalizer, classifier=get_direction_classifier(bank)
+        ))
+        
+        return transactions, primary_currency
+    
+    def extract_transactions_frame_from_pdf_text(self, pdf_text, line_stats=None):
+        """
+        Batch mode of extract_transactions_from_pdf_text: returns the
+        transactions as a DataFrame parsed with vectorized string operations
+        """
+        primary_currency = self.detect_currency(pdf_text)
+        bank = self.detect_bank(pdf_text[:FINGERPRINT_CHARS])
+        self.record_header_dates(pdf_text, line_stats)
+        normalizer = AmountNormalizer.detect(pdf_text)
+        
+        transactions = self.parse_lines_frame(
+            pdf_text.split('\n'), primary_currency, line_stats, BANK_PARSERS.get(bank),
+            normalizer, get_direction_classifier(bank)
+        )
+        
+        return transactions, primary_currency
+    
+    def parse_lines_frame(self, lines, primary_currency, line_stats=None, bank_parser=None, normalizer=None, classifier=None):
+        """
+        Vectorized counterpart of iter_transactions: all lines go into a
+        pandas Series, the combined grammar is applied with Series.str.extract
+        and amounts are converted column-wise. Only candidate lines that no
+        grammar matches go through the per-line fallback parser.
+        """
+        if normalizer is None:
+            normalizer = DEFAULT_AMOUNTS
+        if classifier is None:
+            classifier = DEFAULT_CLASSIFIER
+        lines = pd.Series(lines, dtype=object).str.strip()
+        all_lines = lines
+        frames = []
+        bank_parsed = 0
+        
+        if bank_parser is not None:
+            bank_frame = bank_parser.parse_frame(lines, primary_currency)
+            frames.append(bank_frame)
+            bank_parsed = len(bank_frame)
+            lines = lines.drop(bank_frame.index)
+        
+        # Prefilter: every grammar, generic or bank-specific, starts with a date
+        dates = bank_parser.line_dates if bank_parser is not None else GENERIC_DATES
+        candidates = lines[lines.str.contains(dates.regex)]
+        
+        extracted = candidates.str.extract(normalizer.transaction_re)
+        fields = {}
+        four_field = pd.Series(False, index=candidates.index)
+        has_from = extracted['from_balance'].notna()
+        has_to = extracted['to_balance'].notna()
+        for last_group, names in TRANSACTION_FIELDS.items():
+            grammar_matched = extracted[last_group].notna()
+            if len(names) == 4:
+                four_field |= grammar_matched
+            for field, name in zip(('date', 'desc', 'amount', 'balance'), names):
+                column = extracted[name].where(grammar_matched)
+                fields[field] = column if field not in fields else fields[field].fillna(column)
+        matched = fields['date'].notna()
+        
+        four_field = four_field[matched]
+        has_from = has_from[matched]
+        has_to = has_to[matched]
+        amount_str = fields['amount'][matched]
+        amount = normalizer.to_numeric(amount_str).abs()
+        balance = normalizer.to_numeric(fields['balance'][matched]).fillna(0)
+        description = fields['desc'][matched].str.strip()
+        
+        # Same direction rules as parse_transaction_line
+        balance_rows = four_field & ~has_from & ~has_to
+        described_outgoing = pd.Series(False, index=description.index)
+        described_types, matched_keywords = classifier.classify_series(description[balance_rows])
+        described_outgoing[balance_rows] = described_types == "Outgoing"
+        signed_outgoing = ~four_field & amount_str.str.startswith('-')
+        outgoing = has_to | described_outgoing | signed_outgoing
+        # Amounts are only negative for 'To' lines and signed simple lines
+        amount = amount.where(~(has_to | signed_outgoing), -amount)
+        
+        frames.append(pd.DataFrame({
+            'Date': fields['date'][matched],
+            'Description': description.where(description != '', "Transaction").str[:100],
+            'Amount': amount,
+            'Currency': primary_currency,
+            'Type': outgoing.map({True: "Outgoing", False: "Incoming"}),
+            'Balance': balance
+        }))
+        
+        # Per-line fallback for date lines no grammar matched
+        unmatched = candidates[~matched]
+        keyword_counts = matched_keywords.value_counts().to_dict()
+        fallback = [
+            (index, self.parse_transaction_line(line, primary_currency, dates.search(line), normalizer, classifier, keyword_counts))
+            for index, line in unmatched.items()
         ]
+        fallback = [(index, transaction) for index, transaction in fallback if transaction]
+        if fallback:
+            frames.append(pd.DataFrame(
+                [transaction for _, transaction in fallback],
+                index=[index for index, _ in fallback]
+            ))
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            transaction = None
+        if line_stats is not None:
+            parsed = int(matched.sum()) + len(unmatched)
+            line_stats['rejected'] += len(lines) - parsed
+            line_stats['parsed'] += parsed + bank_parsed
+            line_stats['number_format'] = normalizer.number_format
+            self._count_keywords(line_stats, keyword_counts)
+            if bank_parser is not None:
+                line_stats['bank_parser'] = bank_parser.name
+        
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=TRANSACTION_COLUMNS)
+        transactions = pd.concat(frames).sort_index()
+        transactions['Currency'] = self.currency_detector.tag_rows(all_lines[transactions.index], primary_currency)
+        return transactions.reset_index(drop=True)[TRANSACTION_COLUMNS]
+    
+    def convert_pdf(self, pdf_source, streaming=True, workers=1, chunk_size=None, backend='pdfplumber', triage=True, table_mode=False, template_store=None, low_memory=False, memory_limit_mb=None, batch=False, cache=None, cache_key=None, progress=None, executor=None):
+        """
+        Extract and parse a statement, serving repeat conversions of identical
+        bytes and options from the cache. Returns a dict with transactions, currency,
+        page_count, pages_skipped, backend, extraction_seconds and cache_hit.
+        table_mode parses rows from word coordinates instead of flattened text,
+        reusing column layouts from template_store for known banks.
+        low_memory periodically reopens the PDF to drop parser caches, spills
+        intermediate text to disk.
+        memory_limit_mb raises MemoryLimitExceeded once the process grows past it.
+        batch parses the whole document at once with pandas string operations
+        and returns the transactions as a DataFrame (for callers that want a
+        frame; it is not faster than line parsing, which the app uses).
+        progress (a ConversionProgress) receives the stage, pages done and
+        transactions found as they happen, and can cancel the conversion
+        between pages. executor is a process pool shared by several
+        conversions, used for extraction when workers > 1.
+        """
+        if progress is None:
+            progress = ConversionProgress()
+        
+        if cache is not None and cache_key:
+            # Worker count, chunk size and the memory ceiling don't change the result
+            cache_key = ConversionCache.with_options(
+                cache_key, streaming=streaming, backend=backend, triage=triage,
+                table_mode=table_mode, low_memory=low_memory, batch=batch
+            )
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return {**entry, 'cache_hit': True}
+        
+        stats = {
+            'seconds': 0.0,
+            'pages': 0,
+            'memory_limit_bytes': memory_limit_mb * 1024 * 1024 if memory_limit_mb else None,
+            'progress': progress,
+        }
+        reopen_every = LOW_MEMORY_REOPEN_PAGES if low_memory else None
+        selection_start = time.perf_counter()
+        progress.stage = "Choosing extraction backend"
+        if table_mode:
+            # Word coordinates are only available from pdfplumber
+            backend = ROBUST_BACKEND
+        elif backend == 'auto':
+            backend = self.select_backend(pdf_source)
+        
+        # Triage only pays off in front of the slow backend; the fast one
+        # would cost as much to triage as to extract
+        page_indices = None
+        pages_skipped = 0
+        if triage and backend != FAST_BACKEND:
+            progress.stage = "Skipping non-transaction pages"
+            page_indices, total_pages = self.triage_pages(pdf_source)
+            pages_skipped = total_pages - len(page_indices)
+            progress.total_pages = len(page_indices)
+        else:
+            progress.total_pages = get_backend(FAST_BACKEND).count_pages(pdf_source)
+        stats['seconds'] += time.perf_counter() - selection_start
+        progress.check_cancelled()
+        progress.stage = "Extracting pages"
+        
+        if table_mode:
+            page_iter = self._track_pages(
+                self.iter_pdf_page_words(
+                    pdf_source, workers=workers, chunk_size=chunk_size,
+                    page_indices=page_indices, reopen_every=reopen_every, executor=executor
+                ),
+                stats
+            )
+        else:
+            page_iter = self._track_pages(
+                self.iter_pdf_pages(
+                    pdf_source, workers=workers, chunk_size=chunk_size, backend=backend,
+                    page_indices=page_indices, reopen_every=reopen_every, executor=executor
+                ),
+                stats
+            )
+        
+        table_stats = {}
+        line_stats = {'rejected': 0, 'parsed': 0}
+        if table_mode:
+            transactions, currency = self._collect_transactions(self.iter_table_transactions_from_pages(
+                page_iter, template_store=template_store, table_stats=table_stats, line_stats=line_stats
+            ), progress)
+        elif batch:
+            pdf_text = "".join(page_text + "\n" for page_text in page_iter)
+            progress.stage = "Parsing transactions"
+            transactions, currency = self.extract_transactions_frame_from_pdf_text(pdf_text, line_stats)
+        elif streaming:
+            transactions, currency = self._collect_transactions(self.iter_transactions_from_pages(page_iter, line_stats), progress)
+        elif low_memory:
+            # Spill the intermediate text to disk and parse it back line by line
+            with tempfile.SpooledTemporaryFile(max_size=LOW_MEMORY_SPILL_BYTES, mode='w+', encoding='utf-8') as spool:
+                for page_text in page_iter:
+                    spool.write(page_text + "\n")
+                spool.seek(0)
+                progress.stage = "Parsing transactions"
+                header_text = spool.read(LOW_MEMORY_CURRENCY_SAMPLE)
+                currency = self.detect_currency(header_text)
+                bank = self.detect_bank(header_text[:FINGERPRINT_CHARS])
+                self.record_header_dates(header_text, line_stats)
+                normalizer = AmountNormalizer.detect(header_text)
+                spool.seek(0)
+                transactions, _ = self._collect_transactions(self.iter_transactions(
+                    spool, currency, line_stats, BANK_PARSERS.get(bank),
+                    normalizer=normalizer, classifier=get_direction_classifier(bank)
+                ), progress)
+        else:
+            pdf_text = "".join(page_text + "\n" for page_text in page_iter)
+            progress.stage = "Parsing transactions"
+            transactions, currency = self.extract_transactions_from_pdf_text(pdf_text, line_stats)
+        progress.transactions = len(transactions)
+        
+        result = {
+            'transactions': transactions,
+            'currency': currency,
+            'page_count': stats['pages'],
+            'pages_skipped': pages_skipped,
+            'backend': f"{backend} (table)" if table_mode else backend,
+            'extraction_seconds': stats['seconds'],
+            'table_stats': table_stats,
+            'line_stats': line_stats,
+        }
+        
+        if cache is not None and cache_key and stats['pages']:
+            if isinstance(transactions, pd.DataFrame):
+                # Cache entries are stored as JSON
+                cache.put(cache_key, {**result, 'transactions': transactions.to_dict('records')})
+            else:
+                cache.put(cache_key, result)
+        
+        return {**result, 'cache_hit': False}
+    
+    def _track_pages(self, page_iter, stats):
+        """
+        Pass pages through while counting them, accumulating the time spent
+        extracting them, enforcing the memory ceiling and reporting progress
+        (stopping here when the conversion has been cancelled)
+        """
+        progress = stats['progress']
+        while True:
+            progress.check_cancelled()
+            start = time.perf_counter()
+            try:
+                page_text = next(page_iter)
+            except StopIteration:
+                return
+            finally:
+                stats['seconds'] += time.perf_counter() - start
+            stats['pages'] += 1
+            progress.pages_done = stats['pages']
+            
+            # Fail with a clear error instead of being OOM-killed
+            if stats['memory_limit_bytes']:
+                rss = current_rss_bytes()
+                if rss is not None and rss > stats['memory_limit_bytes']:
+                    raise MemoryLimitExceeded(
+                        f"Memory usage reached {rss / (1024 * 1024):.0f} MB after {stats['pages']} pages, "
+                        f"above the {stats['memory_limit_bytes'] / (1024 * 1024):.0f} MB limit"
+                    )
+            
+            yield page_text
+    
+    def _collect_transactions(self, transactions, progress):
+        """
+        Drain a transaction generator into a list while counting into
+        progress; returns the list and the generator's return value
+        """
+        collected = []
+        while True:
+            try:
+                transaction = next(transactions)
+            except StopIteration as stop:
+                return collected, stop.value
+            progress.transactions += 1
+            collected.append(transaction)
+    
+    def iter_transactions_from_pdf(self, pdf_source, workers=1, chunk_size=None, backend='pdfplumber'):
+        """
+        Streaming pipeline: pages are extracted one by one, their lines go
+        straight into the parser and transactions are yielded as they are found.
+        The full document text is never held in memory. Returns the
+        detected statement currency.
+        """
+        return (yield from self.iter_transactions_from_pages(
+            self.iter_pdf_pages(pdf_source, workers=workers, chunk_size=chunk_size, backend=backend)
+        ))
+    
+    def iter_transactions_from_pages(self, pages, line_stats=None):
+        """
+        Yield transactions from an iterable of page texts. Currency, number
+        format and bank are detected from the first page, holding back up to
+        CURRENCY_HEADER_PAGES pages while the currency evidence is weak.
+        Returns the detected statement currency.
+        """
+        pages = iter(pages)
+        header_pages = []
+        for page_text in pages:
+            header_pages.append(page_text)
+            if len(header_pages) >= CURRENCY_HEADER_PAGES:
+                break
+            if self.score_currency("\n".join(header_pages))['confidence'] >= CURRENCY_MIN_CONFIDENCE:
+                break
+        
+        header_text = "\n".join(header_pages)
+        primary_currency = self.detect_currency(header_text)
+        bank = self.detect_bank(header_text[:FINGERPRINT_CHARS])
+        self.record_header_dates(header_text, line_stats)
+        bank_parser = BANK_PARSERS.get(bank)
+        bank_state = {}
+        normalizer = AmountNormalizer.detect(header_text)
+        classifier = get_direction_classifier(bank)
+        
+        for page_text in itertools.chain(header_pages, pages):
+            yield from self.iter_transactions(
+                page_text.split('\n'), primary_currency, line_stats, bank_parser, bank_state, normalizer, classifier
+            )
+        return primary_currency
+    
+    def iter_table_transactions_from_pages(self, word_pages, template_store=None, table_stats=None, line_stats=None):
+        """
+        Table mode: assign each page's words to Date / Description / Debit /
+        Credit / Balance columns by x-position under the table header.
+        The column layout is learned once (or loaded from template_store for
+        a known bank) and reused on later pages, which are only re-learned
+        when they clearly don't fit. Pages without a usable layout fall back
+        to line parsing. Currency, bank and number format are detected from
+        the first page, holding back up to CURRENCY_HEADER_PAGES pages while
+        the currency evidence is weak. Returns the detected statement
+        currency (None without any pages).
+        """
+        pages = self._iter_word_page_rows(word_pages)
+        header_pages = []
+        for page in pages:
+            header_pages.append(page)
+            if len(header_pages) >= CURRENCY_HEADER_PAGES:
+                break
+            if self.score_currency("\n".join(page_text for _, page_text in header_pages))['confidence'] >= CURRENCY_MIN_CONFIDENCE:
+                break
+        if not header_pages:
+            return None
+        
+        # Currency, bank and number format from the header pages, as in
+        # iter_transactions_from_pages, so a cover page doesn't decide them
+        header_text = "\n".join(page_text for _, page_text in header_pages)
+        primary_currency = self.detect_currency(header_text)
+        bank = self.detect_bank(header_text[:FINGERPRINT_CHARS])
+        self.record_header_dates(header_text, line_stats)
+        bank_parser = BANK_PARSERS.get(bank)
+        bank_state = {}
+        normalizer = AmountNormalizer.detect(header_text)
+        classifier = get_direction_classifier(bank)
+        template = template_store.get(bank) if bank and template_store is not None else None
+        if table_stats is not None:
+            table_stats['bank'] = bank
+            table_stats['template_warm'] = template is not None
+            table_stats['layouts_learned'] = 0
+        
+        for rows, page_text in itertools.chain(header_pages, pages):
+            if template is not None and not self._template_fits(rows, template):
+                template = None
+            
+            if template is None:
+                template = self.detect_column_layout(rows)
+                if template is not None:
+                    if table_stats is not None:
+                        table_stats['layouts_learned'] += 1
+                    if bank and template_store is not None:
+                        template_store.put(bank, template)
             
-            # Try each pattern
-            for pattern in transaction_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    try:
-                        groups = match.groups()
+            if template is None:
+                yield from self.iter_transactions(
+                    page_text.split('\n'), primary_currency, line_stats, bank_parser, bank_state, normalizer, classifier
+                )
+            else:
+                yield from self.parse_table_rows(self._rows_below_header(rows, template), template, primary_currency, normalizer)
+        
+        return primary_currency
+    
+    def _iter_word_page_rows(self, word_pages):
+        """
+        Yield (rows, page text) for each page of positioned words
+        """
+        for words in word_pages:
+            rows = self.group_word_rows(words)
+            yield rows, "\n".join(" ".join(word['text'] for word in row) for row in rows)
+    
+    def _template_fits(self, rows, template):
+        """
+        A page fits the template when most of its dated rows have their date
+        inside the template's Date column
+        """
+        _, date_left, date_right = next(column for column in template['columns'] if column[0] == 'Date')
+        dated_rows = 0
+        fitting_rows = 0
+        
+        for row in rows:
+            date_match = STATEMENT_DATES.search(' '.join(word['text'] for word in row))
+            if date_match is None:
+                continue
+            # The word the date starts in
+            offset = 0
+            for word in row:
+                offset += len(word['text']) + 1
+                if offset > date_match.start():
+                    break
+            dated_rows += 1
+            if date_left <= (word['x0'] + word['x1']) / 2 < date_right:
+                fitting_rows += 1
+        
+        return fitting_rows * 2 >= dated_rows
+    
+    def _rows_below_header(self, rows, template):
+        """
+        Crop a page to the rows under its header, if the page repeats the
+        header inside the template's header band
+        """
+        for row_index, row in enumerate(rows):
+            row_top = row[0]['top']
+            if row_top > template['header_bottom'] + TABLE_HEADER_BAND_TOLERANCE:
+                break
+            if row_top >= template['header_top'] - TABLE_HEADER_BAND_TOLERANCE and any(
+                word['text'].upper().strip(':') in TABLE_HEADER_KEYWORDS for word in row
+            ):
+                return rows[row_index + 1:]
+        
+        # Continuation page without a repeated header
+        return rows
+    
+    def group_word_rows(self, words):
+        """
+        Group positioned words into visual rows, each sorted left to right
+        """
+        rows = []
+        row_top = None
+        for word in sorted(words, key=lambda word: (word['top'], word['x0'])):
+            if row_top is None or word['top'] - row_top > TABLE_ROW_TOLERANCE:
+                rows.append([])
+                row_top = word['top']
+            rows[-1].append(word)
+        
+        for row in rows:
+            row.sort(key=lambda word: word['x0'])
+        return rows
+    
+    def detect_column_layout(self, rows):
+        """
+        Find the table header row and derive column x-boundaries from it.
+        Returns None when no row looks like a transaction table header.
+        """
+        for row in rows:
+            anchors = {}
+            for word in row:
+                column = TABLE_HEADER_KEYWORDS.get(word['text'].upper().strip(':'))
+                if column and column not in anchors:
+                    anchors[column] = (word['x0'] + word['x1']) / 2
+            
+            if 'Date' not in anchors or not anchors.keys() & TABLE_AMOUNT_COLUMNS or len(anchors) < 3:
+                continue
+            
+            # Column edges sit halfway between neighbouring header centres
+            ordered = sorted(anchors.items(), key=lambda item: item[1])
+            edges = [float('-inf')]
+            edges += [(left[1] + right[1]) / 2 for left, right in zip(ordered, ordered[1:])]
+            edges += [float('inf')]
+            
+            return {
+                'columns': [(name, edges[i], edges[i + 1]) for i, (name, _) in enumerate(ordered)],
+                'header_top': min(word['top'] for word in row),
+                'header_bottom': max(word['bottom'] for word in row),
+            }
+        
+        return None
+    
+    def parse_table_rows(self, rows, layout, primary_currency, normalizer=None):
+        """
+        Yield transactions from table rows split into columns by layout.
+        Debit / Credit columns decide the direction; undated rows without
+        amounts continue the previous row's description. A currency code or
+        symbol among a row's words sets that row's currency.
+        """
+        if normalizer is None:
+            normalizer = DEFAULT_AMOUNTS
+        row_currencies = self.currency_detector.row_tokens
+        current = None
+        
+        for row in rows:
+            cells = {name: [] for name, _, _ in layout['columns']}
+            for word in row:
+                center = (word['x0'] + word['x1']) / 2
+                for name, left, right in layout['columns']:
+                    if left <= center < right:
+                        cells[name].append(word['text'])
+                        break
+            
+            date = None
+            amounts = {}
+            description_parts = []
+            row_currency = None
+            for name, tokens in cells.items():
+                if name == 'Date' and tokens:
+                    # Dates such as "1 Apr 2023" span several words
+                    date_text = ' '.join(tokens)
+                    date_match = STATEMENT_DATES.search(date_text)
+                    if date_match:
+                        date = date_match.group()
+                        tokens = (date_text[:date_match.start()] + date_text[date_match.end():]).split()
+                for token in tokens:
+                    if row_currency is None:
+                        row_currency = row_currencies.get(token)
+                    if name in TABLE_AMOUNT_COLUMNS | {'Balance'} and normalizer.token_re.fullmatch(token):
+                        amounts[name] = normalizer.to_float(token)
+                    else:
+                        description_parts.append(token)
+            
+            if date is None:
+                # Wrapped description line
+                if current is not None and description_parts and not amounts:
+                    current['Description'] = f"{current['Description']} {' '.join(description_parts)}"[:100]
+                continue
+            
+            if current is not None:
+                yield current
+                current = None
+            
+            if 'Debit' in amounts:
+                amount = -abs(amounts['Debit'])
+            elif 'Credit' in amounts:
+                amount = abs(amounts['Credit'])
+            elif 'Amount' in amounts:
+                amount = amounts['Amount']
+            else:
+                # Dated row without an amount, e.g. an opening balance line
+                continue
+            
+            description = " ".join(description_parts)
+            current = {
+                'Date': date,
+                'Description': description[:100] if description else "Transaction",
+                'Amount': amount,
+                'Currency': row_currency or primary_currency,
+                'Type': "Outgoing" if amount < 0 else "Incoming",
+                'Balance': amounts.get('Balance', 0)
+            }
+        
+        if current is not None:
+            yield current
+    
+    def iter_transactions(self, lines, primary_currency, line_stats=None, bank_parser=None, bank_state=None, normalizer=None, classifier=None):
+        """
+        Yield transactions parsed from an iterable of text lines.
+        A bank_parser picked by fingerprint gets the first try at each line,
+        with the generic grammars as the fallback; bank_state carries its
+        running balance across calls.
+        Lines without a date are rejected by a cheap prefilter before any
+        generic grammar runs (only the generic date shape counts, plus the
+        bank's own when bank_parser is given); line_stats counts rejected
+        vs parsed lines.
+        normalizer is the statement's AmountNormalizer (1,234.56 by default)
+        and classifier its debit / credit KeywordClassifier (English by default).
+        Each row's currency is tagged from its line in batches of
+        CURRENCY_TAG_BATCH rows, defaulting to primary_currency.
+        """
+        rejected = 0
+        parsed = 0
+        if bank_state is None:
+            bank_state = {}
+        if normalizer is None:
+            normalizer = DEFAULT_AMOUNTS
+        rows = []
+        dates = bank_parser.line_dates if bank_parser is not None else GENERIC_DATES
+        keyword_counts = {}
+        
+        for line in lines:
+            line = line.strip()
+            
+            transaction = None
+            if bank_parser is not None:
+                transaction = bank_parser.parse_line(line, primary_currency, bank_state)
+            
+            if transaction:
+                parsed += 1
+            else:
+                date_match = self.prefilter_line(line, dates)
+                if date_match is None:
+                    rejected += 1
+                    continue
+                
+                parsed += 1
+                transaction = self.parse_transaction_line(line, primary_currency, date_match, normalizer, classifier, keyword_counts)
+                if not transaction:
+                    continue
+            
+            rows.append((transaction, line))
+            if len(rows) >= CURRENCY_TAG_BATCH:
+                yield from self.tag_row_currencies(rows, primary_currency)
+                rows = []
+        
+        yield from self.tag_row_currencies(rows, primary_currency)
+        
+        if line_stats is not None:
+            line_stats['rejected'] += rejected
+            line_stats['parsed'] += parsed
+            line_stats['number_format'] = normalizer.number_format
+            self._count_keywords(line_stats, keyword_counts)
+            if bank_parser is not None:
+                line_stats['bank_parser'] = bank_parser.name
+    
+    def _count_keywords(self, line_stats, keyword_counts):
+        """
+        Add per-keyword counts of the debit / credit keywords that decided
+        transaction types to line_stats['direction_keywords'], for audit
+        """
+        counts = line_stats.setdefault('direction_keywords', {})
+        for keyword, count in keyword_counts.items():
+            counts[keyword] = counts.get(keyword, 0) + count
+    
+    def tag_row_currencies(self, rows, primary_currency):
+        """
+        Set the currency of (transaction, line) pairs from the currency code
+        or symbol in each line, in one vectorized pass; yield the transactions
+        """
+        if not rows:
+            return
+        currencies = self.currency_detector.tag_rows(pd.Series([line for _, line in rows], dtype=object), primary_currency)
+        for (transaction, _), currency in zip(rows, currencies):
+            transaction['Currency'] = currency
+            yield transaction
+    
+    def _count_keyword(self, keyword_counts, keyword):
+        if keyword_counts is not None and keyword is not None:
+            keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
+    
+    def prefilter_line(self, line, dates=GENERIC_DATES):
+        """
+        Return the line's first date match, or None when the line cannot be
+        a transaction. Every grammar starts with a date; dates is the
+        DateMatcher of the shapes this statement's grammars accept.
+        """
+        return dates.search(line)
+    
+    def parse_transaction_line(self, line, primary_currency, date_match=None, normalizer=None, classifier=None, keyword_counts=None):
+        """
+        Parse individual transaction line with a single scan of the combined
+        grammar, dispatching on which grammar matched. date_match, when
+        given, is the prefilter's match on the already-stripped line.
+        keyword_counts, when given, counts the debit / credit keywords that
+        decided transaction types.
+        """
+        line = line.strip()
+        if not line:
+            return None
+        if normalizer is None:
+            normalizer = DEFAULT_AMOUNTS
+        if classifier is None:
+            classifier = DEFAULT_CLASSIFIER
+        
+        if date_match is None:
+            date_match = self.prefilter_line(line)
+            if date_match is None:
+                return None
+        
+        # No grammar can match before the first date in the line
+        match = normalizer.transaction_re.search(line, date_match.start())
+        if match:
+            fields = match.group(*TRANSACTION_FIELDS[match.lastgroup])
+            date = fields[0]
+            description = fields[1].strip()
+            
+            if len(fields) == 4:
+                amount, balance = normalizer.to_floats(fields[2:])
+                if match.lastgroup == 'from_balance':
+                    # Incoming transaction
+                    transaction_type = "Incoming"
+                    amount = abs(amount)
+                elif match.lastgroup == 'to_balance':
+                    # Outgoing transaction
+                    transaction_type = "Outgoing"
+                    amount = -abs(amount)
+                else:
+                    # Determine type by amount sign or description
+                    transaction_type = "Outgoing"
+                    if amount >= 0:
+                        described_type, keyword = classifier.classify(description)
+                        self._count_keyword(keyword_counts, keyword)
+                        if described_type != "Outgoing":
+                            transaction_type = "Incoming"
+                    amount = abs(amount)
+            
+            else:
+                amount_str = fields[2]
+                
+                # Handle negative amounts
+                if amount_str.startswith('-'):
+                    amount = -abs(normalizer.to_float(amount_str[1:]))
+                    transaction_type = "Outgoing"
+                else:
+                    amount = abs(normalizer.to_float(amount_str))
+                    transaction_type = "Incoming"
+                
+                balance = 0  # Will calculate if needed
+            
+            return {
+                'Date': date,
+                'Description': description[:100] if description else "Transaction",
+                'Amount': amount,
+                'Currency': primary_currency,
+                'Type': transaction_type,
+                'Balance': balance
+            }
+        
+        # If no pattern matched, try manual parsing for lines with dates
+        if date_match:
+            try:
+                parts = line.split()
+                if len(parts) >= 3:
+                    date = date_match.group()
+                    remaining_text = line.replace(date, '').strip()
+                    
+                    # Look for amounts in the remaining text (one scan)
+                    amount_matches = list(normalizer.amount_re.finditer(remaining_text))
+                    if amount_matches:
+                        # Get the largest amount (likely the transaction amount)
+                        amounts = [
+                            amount_val
+                            for amount_val in normalizer.to_floats(amount_match.group() for amount_match in amount_matches)
+                            if 0.01 <= amount_val <= 100000000
+                        ]
                         
-                        # Extract components based on pattern
-                        if len(groups) == 4:
-                            if 'From' in line:
-                                # Incoming transaction
-                                date = groups[0]
-                                description = groups[1].strip()
-                                amount = float(groups[2].replace(',', '').replace(' ', ''))
-                                balance = float(groups[3].replace(',', '').replace(' ', ''))
-                                transaction_type = "Incoming"
-                                amount = abs(amount)
-                            elif 'To' in line:
-                                # Outgoing transaction  
-                                date = groups[0]
-                                description = groups[1].strip()
-                                amount = float(groups[2].replace(',', '').replace(' ', ''))
-                                balance = float(groups[3].replace(',', '').replace(' ', ''))
-                                transaction_type = "Outgoing"
+                        if amounts:
+                            amount = max(amounts)
+                            # The description is the text between the amounts
+                            description = ""
+                            end = 0
+                            for amount_match in amount_matches:
+                                description += remaining_text[end:amount_match.start()]
+                                end = amount_match.end()
+                            description = (description + remaining_text[end:]).strip()
+                            
+                            if not description:
+                                description = "Transaction"
+                            
+                            # Determine transaction type
+                            transaction_type, keyword = classifier.classify(line)
+                            self._count_keyword(keyword_counts, keyword)
+                            if transaction_type == "Outgoing":
                                 amount = -abs(amount)
-                            else:
-                                # Last number might be balance
-                                date = groups[0]
-                                description = groups[1].strip()
-                                amount = float(groups[2].replace(',', '').replace(' ', ''))
-                                balance = float(groups[3].replace(',', '').replace(' ', ''))
-                                # Determine type by amount sign or description
-                                if amount < 0 or any(word in description.lower() for word in ['to', 'paid', 'transfer', 'purchase']):
-                                    transaction_type = "Outgoing"
-                                else:
-                                    transaction_type = "Incoming"
+                            elif transaction_type == "Incoming":
                                 amount = abs(amount)
-                        
-                        elif len(groups) == 3:
-                            date = groups[0]
-                            description = groups[1].strip()
-                            amount_str = groups[2].replace(',', '').replace(' ', '')
-                            
-                            # Handle negative amounts
-                            if amount_str.startswith('-'):
-                                amount = -abs(float(amount_str[1:]))
-                                transaction_type = "Outgoing"
                             else:
-                                amount = abs(float(amount_str))
                                 transaction_type = "Incoming"
                             
-                            balance = 0  # Will calculate if needed
-                        
-                        # Create transaction
-                        if transaction is None:
-                            transaction = {
+                            return {
                                 'Date': date,
-                                'Description': description[:100] if description else "Transaction",
+                                'Description': description[:100],
                                 'Amount': amount,
                                 'Currency': primary_currency,
                                 'Type': transaction_type,
-                                'Balance': balance
+                                'Balance': 0
                             }
-                            transactions.append(transaction)
-                            break
-                            
-                    except (ValueError, IndexError):
-                        continue
-            
-            # If no pattern matched, try manual parsing for lines with dates
-            if not transaction and re.search(r'\d{1,2}[-/]\d{1,2}[-/]\d{4}', line):
-                try:
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        date_match = re.search(r'\d{1,2}[-/]\d{1,2}[-/]\d{4}', line)
-                        if date_match:
-                            date = date_match.group()
-                            remaining_text = line.replace(date, '').strip()
-                            
-                            # Look for amounts in the remaining text
-                            amount_matches = re.findall(r'[-+]?\d+[,\s]*\d*\.\d{2}', remaining_text)
-                            if amount_matches:
-                                # Get the largest amount (likely the transaction amount)
-                                amounts = []
-                                for amount_str in amount_matches:
-                                    try:
-                                        clean_amount = amount_str.replace(',', '').replace(' ', '')
-                                        amount_val = float(clean_amount)
-                                        if 0.01 <= amount_val <= 100000000:
-                                            amounts.append(amount_val)
-                                    except:
-                                        continue
-                                
-                                if amounts:
-                                    amount = max(amounts)
-                                    # Remove the largest amount from description
-                                    description = re.sub(re.escape(str(amount)), '', remaining_text)
-                                    description = re.sub(r'[-+]?\d+[,\s]*\d*\.\d{2}', '', description)
-                                    description = description.strip()
-                                    
-                                    if not description:
-                                        description = "Transaction"
-                                    
-                                    # Determine transaction type
-                                    if any(word in line.upper() for word in ['TO', 'OUTWARD', 'DEBIT', 'PAID', 'TRANSFER']):
-                                        transaction_type = "Outgoing"
-                                        amount = -abs(amount)
-                                    elif any(word in line.upper() for word in ['FROM', 'INWARD', 'CREDIT', 'RECEIVED']):
-                                        transaction_type = "Incoming"
-                                        amount = abs(amount)
-                                    else:
-                                        transaction_type = "Incoming"
-                                    
-                                    transaction = {
-                                        'Date': date,
-                                        'Description': description[:100],
-                                        'Amount': amount,
-                                        'Currency': primary_currency,
-                                        'Type': transaction_type,
-                                        'Balance': 0
-                                    }
-                                    transactions.append(transaction)
-                
-                except Exception:
-                    continue
         
-        return transactions, primary_currency
+            except Exception:
+                return None
+        
+        return None
+    
+    def infer_date_format(self, dates):
+        """
+        Pick the date format that parses the most of a statement's unique
+        (separator-normalized) date strings, so DD/MM vs MM/DD is decided by
+        the whole column rather than the first row. None if nothing parses.
+        """
+        best_format, best_count = None, 0
+        for date_format in DATE_FORMATS:
+            count = pd.to_datetime(dates, format=date_format, errors='coerce').notna().sum()
+            if count > best_count:
+                best_format, best_count = date_format, count
+                if count == len(dates):
+                    break
+        return best_format
     
-    def create_excel_output(self, transactions, currency):
+    def parse_dates(self, dates, bank=None, header_dates=()):
         """
-        Create Excel file from transactions
+        Parse a Series of statement dates. Dates are grouped by the grammar
+        date shape they have (the statement bank's shape first), and each
+        group is parsed with the formats its grammar declares, or with the
+        format inferred from the group's dates when it declares none, so
+        DD/MM vs MM/DD is decided per grammar rather than for the column.
+        Dates without a year are placed in the year up to the latest of the
+        header_dates (the statement date or period end, see
+        record_header_dates); without one they take the latest year among
+        the dates, or the year up to today. Each unique date string is
+        parsed once and mapped back. Returns the datetime64 Series and the
+        formats used (None if nothing parsed).
         """
-        if not transactions:
+        unique_dates = pd.unique(dates.astype(str))
+        bank_parser = BANK_PARSERS.get(bank)
+        preferred = bank_parser.date_pattern if bank_parser else None
+        used_formats = []
+        parsed, yearless = self._parse_date_groups(unique_dates, preferred, used_formats)
+        
+        if yearless:
+            header, _ = self._parse_date_groups(pd.unique(pd.Series(list(header_dates), dtype=object)), preferred, [])
+            if header.notna().any():
+                latest = header.max()
+                year = latest.year
+            elif parsed.notna().any():
+                latest = None
+                year = parsed.max().year
+            else:
+                latest = pd.Timestamp.now().normalize()
+                year = latest.year
+            for group, normalized, date_format in yearless:
+                self._fill_dates(parsed, group, normalized + f'/{year}', date_format + '/%Y', date_format, used_formats, latest)
+        
+        return dates.astype(str).map(parsed), ", ".join(used_formats) or None
+    
+    def _parse_date_groups(self, unique_dates, preferred, used_formats):
+        """
+        Parse unique date strings group by group with the formats that
+        include a year; returns the parsed Series and the (group,
+        normalized dates, format) triples of the formats without one
+        """
+        groups = {}
+        for date in unique_dates:
+            groups.setdefault(STATEMENT_DATES.shape_of(date.strip(), preferred), []).append(date)
+        
+        parsed = pd.Series(pd.NaT, index=unique_dates, dtype='datetime64[ns]')
+        yearless = []
+        for pattern, group in groups.items():
+            normalized = pd.Index([DATE_SEPARATOR_RE.sub('/', date.strip()) for date in group])
+            formats = STATEMENT_DATES.shapes[pattern][1] if pattern else None
+            if formats is None:
+                inferred = self.infer_date_format(normalized)
+                formats = [inferred] if inferred else []
+            for date_format in formats:
+                if '%y' not in date_format.lower():
+                    yearless.append((group, normalized, date_format))
+                else:
+                    self._fill_dates(parsed, group, normalized, date_format, date_format, used_formats)
+        return parsed, yearless
+    
+    def _fill_dates(self, parsed, group, normalized, parse_format, date_format, used_formats, latest=None):
+        """
+        Fill the still unparsed dates of a group that parse_format parses,
+        noting date_format as used when it parsed any. Dates after latest
+        (a statement that spans the new year) move back a year.
+        """
+        values = pd.Series(pd.to_datetime(normalized, format=parse_format, errors='coerce'), index=group)
+        if latest is not None:
+            values = values.where(~(values > latest), values - pd.DateOffset(years=1))
+        filled = values.notna() & parsed[group].isna()
+        if filled.any():
+            parsed[values.index[filled]] = values[filled]
+            if date_format not in used_formats:
+                used_formats.append(date_format)
+    
+    def create_excel_output(self, transactions, currency, bank=None, header_dates=()):
+        """
+        Create Excel file from transactions (a list of dicts or a DataFrame).
+        Adds a datetime64 'Parsed Date' column so nothing downstream has to
+        parse the statement's dates again. Amount totals are for the
+        statement currency; 'By Currency' breaks them down per row currency.
+        bank, when known, says which date formats come first; header_dates
+        place dates printed without a year (see parse_dates).
+        """
+        if len(transactions) == 0:
             return None, None
         
-        df = pd.DataFrame(transactions)
+        df, date_format = self.transactions_frame(transactions, bank, header_dates)
         
-        # Sort by date
-        try:
-            df['Date_Sort'] = pd.to_datetime(df['Date'], infer_datetime_format=True, errors='coerce')
-            df = df.sort_values('Date_Sort')
-            df = df.drop('Date_Sort', axis=1)
-        except:
-            pass
+        # Sort by date (stable, so same-day rows keep statement order)
+        df = df.sort_values('Parsed Date', kind='stable')
         
-        # Create summary statistics
+        return df, self.summarize(df, currency, date_format)
+    
+    def transactions_frame(self, transactions, bank=None, header_dates=()):
+        """
+        Build the (unsorted) transactions DataFrame with its 'Parsed Date'
+        column; returns it with the statement's date formats
+        """
+        df = pd.DataFrame(transactions)
+        df['Parsed Date'], date_format = self.parse_dates(df['Date'], bank, header_dates)
+        return df, date_format
+    
+    def summarize(self, df, currency, date_format):
+        """
+        Summary statistics of a transactions DataFrame, in the given
+        statement currency and broken down per row currency
+        """
+        # Create summary statistics, per currency
+        incoming = df['Type'] == 'Incoming'
+        outgoing = df['Type'] == 'Outgoing'
+        by_currency = pd.DataFrame({
+            'Currency': df['Currency'],
+            'Total Transactions': 1,
+            'Incoming Transactions': incoming.astype(int),
+            'Outgoing Transactions': outgoing.astype(int),
+            'Total Incoming Amount': df['Amount'].where(incoming, 0.0),
+            'Total Outgoing Amount': df['Amount'].where(outgoing, 0.0).abs(),
+            'Net Amount': df['Amount'],
+        }).groupby('Currency', sort=False).sum()
+        by_currency = by_currency.sort_values('Total Transactions', ascending=False, kind='stable')
+        
+        statement_totals = by_currency.loc[currency] if currency in by_currency.index else None
         summary = {
-            'Total Transactions': len(transactions),
-            'Incoming Transactions': len([t for t in transactions if t['Type'] == 'Incoming']),
-            'Outgoing Transactions': len([t for t in transactions if t['Type'] == 'Outgoing']),
-            'Total Incoming Amount': sum([t['Amount'] for t in transactions if t['Type'] == 'Incoming']),
-            'Total Outgoing Amount': abs(sum([t['Amount'] for t in transactions if t['Type'] == 'Outgoing'])),
-            'Net Amount': sum([t['Amount'] for t in transactions]),
-            'Currency': currency
+            'Total Transactions': len(df),
+            'Incoming Transactions': int(incoming.sum()),
+            'Outgoing Transactions': int(outgoing.sum()),
+            'Total Incoming Amount': float(statement_totals['Total Incoming Amount']) if statement_totals is not None else 0.0,
+            'Total Outgoing Amount': float(statement_totals['Total Outgoing Amount']) if statement_totals is not None else 0.0,
+            'Net Amount': float(statement_totals['Net Amount']) if statement_totals is not None else 0.0,
+            'Currency': currency,
+            'Date Format': date_format,
+            'By Currency': by_currency.reset_index().to_dict('records')
         }
         
-        return df, summary
+        return summary
+
+@st.cache_resource
+def get_converter():
+    """
+    Process-wide converter, shared by every session and rerun (it keeps
+    no per-conversion state)
+    """
+    return UniversalBankConverter()
+
+def convert_upload(converter, name, cache_key, file_bytes, options, progress, executor=None):
+    """
+    Convert one uploaded PDF into its unsorted transactions DataFrame.
+    Returns a dict with the file name, convert_pdf's result (without the
+    transactions), the statement currency, df, date_format and error
+    ('no_text' / 'no_transactions', or None).
+    """
+    result = converter.convert_pdf(
+        file_bytes,
+        template_store=get_template_store(),
+        cache=get_conversion_cache(),
+        cache_key=cache_key,
+        progress=progress,
+        executor=executor,
+        **options
+    )
+    transactions = result.pop('transactions')
+    upload = {'name': name, 'result': result, 'currency': result['currency'], 'df': None, 'date_format': None, 'error': None}
+    
+    if not result['page_count']:
+        upload['error'] = 'no_text'
+    elif len(transactions) == 0:
+        upload['error'] = 'no_transactions'
+    else:
+        progress.stage = "Building transaction table"
+        bank = result['line_stats'].get('bank_parser') or result['table_stats'].get('bank')
+        upload['df'], upload['date_format'] = converter.transactions_frame(
+            transactions, bank, result['line_stats'].get('header_dates', ())
+        )
+    
+    progress.finish()
+    return upload
+
+@st.cache_data(max_entries=CONVERSION_RESULT_ENTRIES, show_spinner=False)
+def convert_statements(sources, options, _files, _progress=None):
+    """
+    Convert one or more uploaded statements into everything the results
+    view shows: the transactions DataFrame, summary and charts (the Excel
+    workbook is only built on download, see excel_workbook).
+    sources are the (file name, content key) pairs of the uploads and
+    _files their PDF bytes. With workers > 1, several files are converted
+    at once and all of them extract pages in one shared process pool, so
+    throughput follows the worker count rather than the number of files.
+    The files are merged into one DataFrame with a 'Source File' column
+    (when there is more than one) and sorted chronologically once.
+    Memoized on the sources and the processing options (the PDF bytes and
+    the progress tracker are not hashed), so converting the same files
+    twice costs nothing.
+    """
+    if _progress is None:
+        _progress = BatchProgress(len(sources))
+    
+    converter = get_converter()
+    workers = options['workers']
+    # A single statement keeps its own per-PDF pool (see _iter_pdf_pages_parallel)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(sources) > 1 else None
+    
+    # Uploads with the same file name still get their own rows and sheet
+    names = []
+    for name, _ in sources:
+        unique_name, copy = name, 2
+        while unique_name in names:
+            unique_name, copy = f"{name} ({copy})", copy + 1
+        names.append(unique_name)
+    
+    def convert(index):
+        return convert_upload(converter, names[index], sources[index][1], _files[index], options, _progress.files[index], executor)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            uploads = list(threads.map(convert, range(len(sources))))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    conversion = {'uploads': [{key: value for key, value in upload.items() if key != 'df'} for upload in uploads], 'error': None}
+    converted = [upload for upload in uploads if upload['df'] is not None]
+    if not converted:
+        conversion['error'] = uploads[0]['error'] if len(uploads) == 1 else 'no_transactions'
+        return conversion
+    
+    if len(sources) > 1:
+        _progress.merge_stage = "Merging statements"
+        for upload in converted:
+            upload['df'].insert(0, 'Source File', upload['name'])
+    
+    # Sort by date once across all files (stable, so same-day rows keep
+    # statement and upload order)
+    df = pd.concat([upload['df'] for upload in converted], ignore_index=True)
+    df = df.sort_values('Parsed Date', kind='stable')
+    
+    # The statement currency of the merged result is the most common one
+    currency = pd.Series([upload['currency'] for upload in converted]).mode().iloc[0]
+    date_format = ", ".join(dict.fromkeys(upload['date_format'] for upload in converted if upload['date_format'])) or None
+    summary = converter.summarize(df, currency, date_format)
+    if len(sources) > 1:
+        summary['By File'] = [
+            {
+                'Source File': upload['name'],
+                'Currency': upload['currency'],
+                'Transactions': len(upload['df']),
+                'From': upload['df']['Parsed Date'].min(),
+                'To': upload['df']['Parsed Date'].max(),
+            }
+            for upload in converted
+        ]
+    
+    conversion.update({
+        'df': df,
+        'summary': summary,
+        'currency': currency,
+        'file_name': f"bank_statement_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+    })
+    _progress.merge_stage = "Drawing charts"
+    conversion['figures'] = build_figures(df)
+    return conversion
+
+class ConversionJob:
+    """
+    Runs convert_statements for the current uploads on a background thread,
+    so the page stays responsive while it polls progress and can cancel
+    the work
+    """
+    
+    def __init__(self, sources, options, files):
+        self.key = sources
+        self.options = options
+        self.progress = BatchProgress(len(sources))
+        self.conversion = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(files,), daemon=True)
+    
+    def _run(self, files):
+        try:
+            self.conversion = convert_statements(self.key, self.options, files, self.progress)
+        except Exception as e:
+            self.error = e
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def cancel(self):
+        self.progress.cancel()
+    
+    def done(self):
+        return not self._thread.is_alive()
+
+@st.fragment(run_every=PROGRESS_POLL_SECONDS)
+def show_conversion_progress():
+    """
+    Poll the running conversion job: progress bar, live counts and a cancel
+    button. Only this fragment reruns while polling; the whole page reruns
+    once the job has finished so its result can be shown.
+    """
+    job = st.session_state.get('job')
+    if job is None or job.done():
+        st.rerun()
+    
+    progress = job.progress
+    pages = f"{progress.pages_done} / {progress.total_pages}" if progress.total_pages else f"{progress.pages_done}"
+    stage = "Cancelling" if progress.cancelled else progress.stage
+    st.progress(
+        progress.fraction(),
+        text=f"📊 {stage}... {pages} pages, {progress.transactions} transactions found so far"
+    )
+    if st.button("⏹️ Cancel", disabled=progress.cancelled):
+        job.cancel()
+
+# Excel sheet names: at most 31 characters, none of []:*?/\\
+EXCEL_SHEET_NAME_CHARS = 31
+EXCEL_SHEET_NAME_INVALID_RE = re.compile(r'[\[\]:*?/\\]')
+
+def excel_sheet_name(file_name, taken):
+    """
+    A valid sheet name for an uploaded file, unique among taken (which it
+    is added to)
+    """
+    base = EXCEL_SHEET_NAME_INVALID_RE.sub('_', os.path.splitext(file_name)[0]).strip("' ") or 'Statement'
+    name = base[:EXCEL_SHEET_NAME_CHARS]
+    suffix = 2
+    while name.lower() in taken:
+        tag = f" ({suffix})"
+        name = base[:EXCEL_SHEET_NAME_CHARS - len(tag)] + tag
+        suffix += 1
+    taken.add(name.lower())
+    return name
+
+@st.cache_data(max_entries=CONVERSION_RESULT_ENTRIES, show_spinner=False)
+def excel_workbook(sources, options, _df, _summary):
+    """
+    Build the .xlsx bytes for a conversion. Called by the download button
+    when it is clicked, off the page script, and memoized like
+    convert_statements so each result is exported at most once.
+    Several statements get a consolidated sheet plus one sheet per file.
+    """
+    summary_sheets = [key for key, value in _summary.items() if isinstance(value, list)]
+    
+    # Create Excel file with multiple sheets
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        if 'Source File' in _df.columns:
+            # Consolidated sheet, then each file's rows (already in date order)
+            _df.to_excel(writer, sheet_name='All Transactions', index=False)
+            taken = {'all transactions', 'summary', *(key.lower() for key in summary_sheets)}
+            file_dfs = dict(tuple(_df.groupby('Source File', sort=False)))
+            for upload in _summary['By File']:
+                file_df = file_dfs[upload['Source File']].drop(columns='Source File')
+                file_df.to_excel(writer, sheet_name=excel_sheet_name(upload['Source File'], taken), index=False)
+        else:
+            # Transactions sheet
+            _df.to_excel(writer, sheet_name='Transactions', index=False)
+        
+        # Summary sheet
+        summary_df = pd.DataFrame([{key: value for key, value in _summary.items() if key not in summary_sheets}])
+        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+        
+        # Per-currency (and per-file) totals sheets
+        for key in summary_sheets:
+            pd.DataFrame(_summary[key]).to_excel(writer, sheet_name=key, index=False)
+    
+    return buffer.getvalue()
+
+def build_figures(df):
+    """
+    Build the analytics charts for a transactions DataFrame. Each entry is
+    a plotly figure, or a message to show when the chart can't be drawn.
+    """
+    figures = {}
+    
+    # Transaction type distribution
+    type_counts = df['Type'].value_counts()
+    figures['types'] = px.pie(
+        values=type_counts.values,
+        names=type_counts.index,
+        title="Transaction Type Distribution"
+    )
+    
+    # Daily transaction amounts
+    try:
+        daily_amounts = df.groupby('Date')['Amount'].sum().reset_index()
+        fig2 = px.line(
+            daily_amounts,
+            x='Date',
+            y='Amount',
+            title="Daily Transaction Amounts"
+        )
+        fig2.add_hline(y=0, line_dash="dash", line_color="red")
+        figures['daily'] = fig2
+    except:
+        figures['daily'] = "Daily chart requires multiple date entries"
+    
+    # Simple monthly analysis
+    try:
+        months = df['Parsed Date'].dt.strftime('%Y-%m').rename('Month')
+        monthly_summary = df.groupby([months, 'Type'])['Amount'].sum().unstack(fill_value=0)
+        
+        if not monthly_summary.empty and len(monthly_summary) > 1:
+            figures['monthly'] = px.bar(
+                monthly_summary.reset_index(),
+                x='Month',
+                y=monthly_summary.columns,
+                title="Monthly Transaction Summary",
+                barmode='group'
+            )
+        else:
+            figures['monthly'] = "Monthly analysis requires data spanning multiple months"
+    except:
+        figures['monthly'] = "Monthly analysis requires proper date formatting"
+    
+    return figures
+
+@st.fragment
+def show_transactions_grid(df):
+    """
+    Searchable, filterable, paginated transactions table. Filtering,
+    sorting and paging run here on the server, so only the visible page is
+    sent to the browser, and changing them reruns just this fragment.
+    Amount and Balance stay numeric and are formatted by the grid itself.
+    """
+    filter_columns = ['Source File', 'Type', 'Currency'] if 'Source File' in df.columns else ['Type', 'Currency']
+    columns = st.columns([3] + [2] * len(filter_columns) + [2])
+    with columns[0]:
+        query = st.text_input("🔍 Search descriptions")
+    
+    mask = np.ones(len(df), dtype=bool)
+    if query:
+        mask &= df['Description'].str.contains(query, case=False, regex=False, na=False).to_numpy()
+    for column, container in zip(filter_columns, columns[1:]):
+        with container:
+            selected = st.multiselect(column, df[column].dropna().unique().tolist())
+        if selected:
+            mask &= df[column].isin(selected).to_numpy()
+    
+    with columns[-1]:
+        sort_order = st.selectbox("Sort by", list(TRANSACTION_SORT_ORDERS))
+    
+    # Rows are already in chronological order
+    view = df[mask] if not mask.all() else df
+    sort_column, ascending = TRANSACTION_SORT_ORDERS[sort_order]
+    if (sort_column, ascending) != ('Parsed Date', True):
+        view = view.sort_values(sort_column, ascending=ascending, kind='stable')
+    
+    page_size = TRANSACTION_PAGE_SIZES[0]
+    page = 1
+    if len(view) > TRANSACTION_PAGE_SIZES[0]:
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rows per page", TRANSACTION_PAGE_SIZES, index=TRANSACTION_PAGE_SIZES.index(TRANSACTION_DEFAULT_PAGE_SIZE))
+        page_count = math.ceil(len(view) / page_size)
+        with col2:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    
+    start = (page - 1) * page_size
+    window = view.iloc[start:start + page_size]
+    st.dataframe(
+        window,
+        width="stretch",
+        hide_index=True,
+        column_config={
+            'Amount': st.column_config.NumberColumn(format="%,.2f"),
+            'Balance': st.column_config.NumberColumn(format="%,.2f"),
+            'Parsed Date': None,
+        }
+    )
+    st.caption(f"Rows {start + 1 if len(window) else 0}–{start + len(window)} of {len(view)} matching ({len(df)} transactions)")
+
+def show_figure(figure):
+    """
+    Draw a chart from build_figures, or its fallback message
+    """
+    if isinstance(figure, str):
+        st.info(figure)
+    else:
+        st.plotly_chart(figure, width="stretch")
+
+def show_extraction_stats(result):
+    """
+    Extraction and parsing details of a single converted statement
+    """
+    if result['cache_hit']:
+        st.info("⚡ Loaded previous conversion of this file from cache")
+        return
+    
+    st.info(
+        f"📄 Extracted {result['page_count']} pages with {result['backend']} in {result['extraction_seconds']:.2f}s "
+        f"({result['pages_skipped']} non-transaction pages skipped)"
+    )
+    line_stats = result['line_stats']
+    st.info(f"🔎 Line prefilter: {line_stats['parsed']} candidate lines parsed, {line_stats['rejected']} lines rejected")
+    if line_stats.get('bank_parser'):
+        st.info(f"🏦 Parsed with the {line_stats['bank_parser']} statement format")
+    if line_stats.get('direction_keywords'):
+        keywords = sorted(line_stats['direction_keywords'].items(), key=lambda item: item[1], reverse=True)
+        st.info("🔑 Debit / credit keywords matched: " + ", ".join(f"{keyword} × {count}" for keyword, count in keywords))
+    table_stats = result['table_stats']
+    if table_stats.get('bank'):
+        template_source = "stored" if table_stats['template_warm'] else "learned"
+        st.info(f"📐 {table_stats['bank']} column layout {template_source} ({table_stats['layouts_learned']} re-learned)")
+
+def upload_status(upload):
+    """
+    One-line outcome of a file in a multi-file conversion
+    """
+    if upload['error'] == 'no_text':
+        return "❌ No readable text"
+    if upload['error'] == 'no_transactions':
+        return "❌ No transactions found"
+    if upload['result']['cache_hit']:
+        return "⚡ Converted (from cache)"
+    return "✅ Converted"
+
+def render_conversion(conversion):
+    """
+    Render a finished conversion: extraction stats, metrics, the
+    transactions table, the download button and the charts
+    """
+    uploads = conversion['uploads']
+    if len(uploads) == 1:
+        show_extraction_stats(uploads[0]['result'])
+    else:
+        # One row of extraction stats per file
+        st.dataframe(pd.DataFrame([
+            {
+                'File': upload['name'],
+                'Pages': upload['result']['page_count'],
+                'Pages Skipped': upload['result']['pages_skipped'],
+                'Backend': upload['result']['backend'],
+                'Extraction Seconds': round(upload['result']['extraction_seconds'], 2),
+                'Currency': upload['currency'],
+                'Status': upload_status(upload),
+            }
+            for upload in uploads
+        ]), width="stretch", hide_index=True)
+    
+    if conversion['error'] == 'no_text':
+        st.error("❌ Could not extract text from the PDF. Please ensure the PDF contains readable text.")
+        return
+    
+    if conversion['error'] == 'no_transactions':
+        st.error("❌ No transactions found in the PDF. Please ensure this is a bank statement with transaction data.")
+        st.info("💡 Try uploading a different PDF or check if the statement format is supported.")
+        return
+    
+    df, summary, currency = conversion['df'], conversion['summary'], conversion['currency']
+    
+    # Display results
+    if len(uploads) > 1:
+        st.success(f"✅ Conversion completed successfully! Found {len(df)} transactions in {len(summary['By File'])} statements")
+    else:
+        st.success(f"✅ Conversion completed successfully! Found {len(df)} transactions in {currency}")
+    
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Transactions", summary['Total Transactions'])
+    
+    with col2:
+        st.metric("Incoming", summary['Incoming Transactions'])
+    
+    with col3:
+        st.metric("Outgoing", summary['Outgoing Transactions'])
+    
+    with col4:
+        st.metric(f"Net Amount ({currency})", f"{summary['Net Amount']:,.2f}")
+    
+    # Several statements: transactions and date range per file
+    if 'By File' in summary:
+        st.subheader("🗂️ Statements")
+        st.dataframe(pd.DataFrame(summary['By File']), width="stretch", hide_index=True)
+    
+    # Multi-currency statements: totals per currency
+    if len(summary['By Currency']) > 1:
+        st.subheader("💱 Totals by Currency")
+        st.dataframe(pd.DataFrame(summary['By Currency']), width="stretch", hide_index=True)
+    
+    # Display transactions table
+    st.header("📊 Transaction Summary")
+    show_transactions_grid(df)
+    
+    # Download button
+    st.header("💾 Download Results")
+    
+    # The workbook is generated when the button is clicked, so the table and
+    # charts never wait on the export
+    st.download_button(
+        label="📥 Download Excel File",
+        data=functools.partial(excel_workbook, conversion['key'], conversion['options'], conversion['df'], summary),
+        file_name=conversion['file_name'],
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore"
+    )
+    
+    # Visualizations
+    st.header("📈 Visual Analytics")
+    
+    # Create charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        show_figure(conversion['figures']['types'])
+    
+    with col2:
+        show_figure(conversion['figures']['daily'])
+    
+    # Monthly summary
+    st.subheader("📅 Monthly Summary")
+    show_figure(conversion['figures']['monthly'])
 
 def main():
     """
@@ -414,7 +2703,7 @@ def main():
     """
     
     # Initialize converter
-    converter = UniversalBankConverter()
+    converter = get_converter()
     
     # Main header
     st.markdown('<h1 class="main-header">🏦 Universal Bank Statement Converter</h1>', unsafe_allow_html=True)
@@ -424,7 +2713,7 @@ def main():
     with st.sidebar:
         st.header("📋 How to Use")
         st.markdown("""
-        1. **Upload PDF**: Select your bank statement PDF file
+        1. **Upload PDFs**: Select one or more bank statement PDF files
         2. **Process**: Click the convert button to extract transactions
         3. **Review**: Check the extracted data and visualizations
         4. **Download**: Get your Excel file with all transactions
@@ -450,166 +2739,133 @@ def main():
         - Visual analytics
         - Data validation
         """)
+        
+        st.header("⚙️ Processing Options")
+        streaming_mode = st.checkbox(
+            "Streaming extraction",
+            value=True,
+            help="Parse the PDF page by page so memory stays flat on very long statements."
+        )
+        extraction_backend = st.selectbox(
+            "Extraction backend",
+            options=['auto', 'pdfplumber', 'pypdf2'],
+            help="auto tries the fast PyPDF2 backend first and falls back to pdfplumber when its text looks unreliable."
+        )
+        table_mode = st.checkbox(
+            "Table mode (column positions)",
+            value=False,
+            help="Split rows into Date / Description / Debit / Credit / Balance by their position under the table header. Uses pdfplumber."
+        )
+        skip_pages = st.checkbox(
+            "Skip non-transaction pages",
+            value=True,
+            help="Cheaply triage pages first and skip cover pages, terms and conditions and inserts that contain no dates."
+        )
+        low_memory = st.checkbox(
+            "Low-memory mode",
+            value=False,
+            help="Bound memory on very long PDFs: release parser caches as pages are processed and spill intermediate text to disk."
+        )
+        memory_limit_mb = 0
+        if low_memory:
+            memory_limit_mb = st.number_input(
+                "Memory ceiling (MB)",
+                min_value=0,
+                value=900,
+                help="Stop with an error instead of being killed when memory grows past this. 0 disables the ceiling."
+            )
+        # A slider needs two distinct bounds; single-core hosts extract on one core
+        extraction_workers = 1
+        if (os.cpu_count() or 1) > 1:
+            extraction_workers = st.slider(
+                "Parallel extraction workers",
+                min_value=1,
+                max_value=os.cpu_count(),
+                value=1,
+                help="Extract pages in parallel processes, shared by all uploaded files. Use 1 to extract on a single core."
+            )
+        chunk_size = st.number_input(
+            "Pages per worker chunk",
+            min_value=0,
+            value=0,
+            help="Number of pages each worker extracts per task. 0 picks a size automatically."
+        )
     
     # File upload section
-    st.header("📄 Upload Bank Statement")
+    st.header("📄 Upload Bank Statements")
     
-    uploaded_file = st.file_uploader(
-        "Choose a PDF file",
+    uploaded_files = st.file_uploader(
+        "Choose PDF files",
         type="pdf",
-        help="Upload your bank statement PDF. Supported: Statement PDFs from any bank in any country."
+        accept_multiple_files=True,
+        help="Upload one or more bank statement PDFs (e.g. a year of monthly statements). Supported: Statement PDFs from any bank in any country."
     )
     
-    if uploaded_file is not None:
-        # Process the file
-        st.success(f"✅ File uploaded: {uploaded_file.name}")
+    if uploaded_files:
+        # Process the files
+        if len(uploaded_files) == 1:
+            st.success(f"✅ File uploaded: {uploaded_files[0].name}")
+        else:
+            st.success(f"✅ {len(uploaded_files)} files uploaded: {', '.join(uploaded_file.name for uploaded_file in uploaded_files)}")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_file.write(uploaded_file.getvalue())
-            temp_file_path = temp_file.name
+        # Each upload's content key (SHA-256 + parser version) ties results to
+        # these exact files. It is hashed once per upload, not on every rerun.
+        known_keys = st.session_state.get('upload_keys', {})
+        upload_keys = st.session_state['upload_keys'] = {
+            uploaded_file.file_id: known_keys.get(uploaded_file.file_id) or ConversionCache.make_key(uploaded_file.getvalue())
+            for uploaded_file in uploaded_files
+        }
+        sources = tuple((uploaded_file.name, upload_keys[uploaded_file.file_id]) for uploaded_file in uploaded_files)
+        options = {
+            'streaming': streaming_mode,
+            'workers': extraction_workers,
+            'chunk_size': chunk_size,
+            'backend': extraction_backend,
+            'triage': skip_pages,
+            'table_mode': table_mode,
+            'low_memory': low_memory,
+            'memory_limit_mb': memory_limit_mb,
+        }
+        
+        # Collect a finished background conversion
+        job = st.session_state.get('job')
+        finished_job = None
+        if job is not None and job.done():
+            finished_job = st.session_state.pop('job')
+            job = None
         
         # Convert button
-        if st.button("🔄 Convert to Excel", type="primary"):
-            with st.spinner("📊 Processing your bank statement..."):
-                try:
-                    # Extract text from PDF using pdfplumber
-                    st.info("🔧 Extracting text from PDF...")
-                    pdf_text = converter.extract_pdf_text(temp_file_path)
-                    
-                    if not pdf_text:
-                        st.error("❌ Could not extract text from the PDF. Please ensure the PDF contains readable text.")
-                        return
-                    
-                    # Extract transactions
-                    st.info("🔍 Analyzing transactions...")
-                    transactions, currency = converter.extract_transactions_from_pdf_text(pdf_text)
-                    
-                    if not transactions:
-                        st.error("❌ No transactions found in the PDF. Please ensure this is a bank statement with transaction data.")
-                        st.info("💡 Try uploading a different PDF or check if the statement format is supported.")
-                        return
-                    
-                    # Create DataFrame and summary
-                    df, summary = converter.create_excel_output(transactions, currency)
-                    
-                    # Clean up temp file
-                    os.unlink(temp_file_path)
-                    
-                    # Display results
-                    st.success(f"✅ Conversion completed successfully! Found {len(transactions)} transactions in {currency}")
-                    
-                    # Summary metrics
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.metric("Total Transactions", summary['Total Transactions'])
-                    
-                    with col2:
-                        st.metric("Incoming", summary['Incoming Transactions'])
-                    
-                    with col3:
-                        st.metric("Outgoing", summary['Outgoing Transactions'])
-                    
-                    with col4:
-                        st.metric(f"Net Amount ({currency})", f"{summary['Net Amount']:,.2f}")
-                    
-                    # Display transactions table
-                    st.header("📊 Transaction Summary")
-                    
-                    # Format the dataframe for display
-                    df_display = df.copy()
-                    df_display['Amount'] = df_display.apply(
-                        lambda row: f"+{row['Amount']:,.2f} {row['Currency']}" if row['Amount'] > 0 else f"{row['Amount']:,.2f} {row['Currency']}",
-                        axis=1
-                    )
-                    
-                    st.dataframe(
-                        df_display,
-                        use_container_width=True,
-                        hide_index=True
-                    )
-                    
-                    # Download button
-                    st.header("💾 Download Results")
-                    
-                    # Create Excel file in memory
-                    
-                    # Create Excel file with multiple sheets
-                    buffer = io.BytesIO()
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        # Transactions sheet
-                        df.to_excel(writer, sheet_name='Transactions', index=False)
-                        
-                        # Summary sheet
-                        summary_df = pd.DataFrame([summary])
-                        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    buffer.seek(0)
-                    
-                    st.download_button(
-                        label="📥 Download Excel File",
-                        data=buffer.getvalue(),
-                        file_name=f"bank_statement_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-                    
-                    # Visualizations
-                    st.header("📈 Visual Analytics")
-                    
-                    # Create charts
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Transaction type distribution
-                        type_counts = df['Type'].value_counts()
-                        fig1 = px.pie(
-                            values=type_counts.values,
-                            names=type_counts.index,
-                            title="Transaction Type Distribution"
-                        )
-                        st.plotly_chart(fig1, use_container_width=True)
-                    
-                    with col2:
-                        # Daily transaction amounts
-                        try:
-                            daily_amounts = df.groupby('Date')['Amount'].sum().reset_index()
-                            fig2 = px.line(
-                                daily_amounts,
-                                x='Date',
-                                y='Amount',
-                                title="Daily Transaction Amounts"
-                            )
-                            fig2.add_hline(y=0, line_dash="dash", line_color="red")
-                            st.plotly_chart(fig2, use_container_width=True)
-                        except:
-                            st.info("Daily chart requires multiple date entries")
-                    
-                    # Monthly summary
-                    st.subheader("📅 Monthly Summary")
-                    
-                    # Simple monthly analysis
-                    try:
-                        df['Month'] = pd.to_datetime(df['Date'], errors='coerce').dt.strftime('%Y-%m')
-                        monthly_summary = df.groupby(['Month', 'Type'])['Amount'].sum().unstack(fill_value=0)
-                        
-                        if not monthly_summary.empty and len(monthly_summary) > 1:
-                            fig3 = px.bar(
-                                monthly_summary.reset_index(),
-                                x='Month',
-                                y=monthly_summary.columns,
-                                title="Monthly Transaction Summary",
-                                barmode='group'
-                            )
-                            st.plotly_chart(fig3, use_container_width=True)
-                        else:
-                            st.info("Monthly analysis requires data spanning multiple months")
-                    except:
-                        st.info("Monthly analysis requires proper date formatting")
-                    
-                except Exception as e:
-                    st.error(f"❌ Error processing file: {str(e)}")
-                    st.info("Please try with a different PDF file or contact support.")
+        if st.button("🔄 Convert to Excel", type="primary", disabled=job is not None):
+            # Extract text and transactions on a background thread (repeat
+            # uploads are served from cache); uploads are parsed straight
+            # from memory, no temp files
+            files = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+            job = st.session_state['job'] = ConversionJob(sources, options, files).start()
+        
+        if job is not None:
+            show_conversion_progress()
+        elif finished_job is not None and finished_job.error is not None:
+            if isinstance(finished_job.error, ConversionCancelled):
+                st.warning("⏹️ Conversion cancelled")
+            elif isinstance(finished_job.error, MemoryLimitExceeded):
+                st.error(f"❌ {str(finished_job.error)}")
+                st.info("💡 Try low-memory mode with streaming extraction, or split the statement into smaller PDFs.")
+            else:
+                st.error(f"❌ Error processing file: {str(finished_job.error)}")
+                st.info("Please try with a different PDF file or contact support.")
+        else:
+            if finished_job is not None:
+                st.session_state['conversion'] = {
+                    'key': finished_job.key,
+                    'options': finished_job.options,
+                    **finished_job.conversion
+                }
+            
+            # Reruns (downloads, widget changes, resizes) re-render the last
+            # conversion of these uploads instead of parsing them again
+            conversion = st.session_state.get('conversion')
+            if conversion is not None and conversion['key'] == sources:
+                render_conversion(conversion)
     
     else:
         # Demo section when no file is uploaded